@@ -0,0 +1,174 @@
+"""Parser and getter benchmarks against recorded M4250/M4300 output.
+
+Usage:
+    python benchmarks/bench.py [--model M] [--ports N] [--macs N] [--latency S]
+                               [--repeat N] [--json FILE] [--compare FILE]
+
+The recorded fixtures of the model are scaled up synthetically to the requested number
+of ports and MAC table entries. Results can be written as JSON and compared
+against the JSON of an earlier release.
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from fakedevice import FakeDevice, load_fixtures  # noqa: E402
+from napalm_netgear import NetgearDriver  # noqa: E402
+from napalm_netgear.parser import parseFixedLenght, parseList  # noqa: E402
+
+
+PORT_BLOCK = re.compile(r"^interface \d+(?:/\d+)+\n.*?^exit\n+", re.M | re.S)
+
+
+def _table(output):
+    """Split a recorded table into header lines, the first row and the rest."""
+    lines = output.splitlines()
+    sep = next(i for i, line in enumerate(lines) if line.startswith("-"))
+    return lines[:sep + 1], lines[sep + 1:]
+
+
+def _port_names(name):
+    """Return a function naming the i-th port like name, "0/1" or stacked "1/0/1"."""
+    if name.count("/") == 2:
+        return lambda i: "%d/0/%d" % (i // 48 + 1, i % 48 + 1)
+    slot = name.split("/")[0]
+    return lambda i: "%s/%d" % (slot, i + 1)
+
+
+def scale_outputs(outputs, ports, macs):
+    """Return a copy of outputs with ports interfaces and macs MAC entries.
+
+    The interfaces are named like the recorded ones of the model.
+    """
+    outputs = dict(outputs)
+
+    header, rows = _table(outputs["show interfaces status all"])
+    port_rows = [row for row in rows if row[:1].isdigit()]
+    other_rows = [row for row in rows if not row[:1].isdigit()]
+    port_name = _port_names(port_rows[0].split()[0])
+    scaled = []
+    for i in range(ports):
+        row = port_rows[i % len(port_rows)]
+        name = port_name(i)
+        scaled.append(name.ljust(10) + row[10:])
+    outputs["show interfaces status all"] = "\n".join(header + scaled + other_rows)
+
+    header, rows = _table(outputs["show mac-addr-table"])
+    scaled = []
+    for i in range(macs):
+        row = rows[i % len(rows)]
+        mac = ":".join("%02X" % b for b in (i + 0x020000000000).to_bytes(6, "big"))
+        port = port_name(i % ports)
+        scaled.append(row[:9] + mac.ljust(20) + port.ljust(23) + row[52:])
+    outputs["show mac-addr-table"] = "\n".join(header + scaled)
+
+    # the recorded port blocks are replaced, a port is configured once
+    config = PORT_BLOCK.sub("", outputs["show running-config"]).rstrip()
+    body, end = config.rsplit("\n", 1)
+    interfaces = "".join(
+        "interface %s\ndescription 'port %d'\nvlan participation include 10\n"
+        "vlan pvid 10\nexit\n\n\n\n" % (port_name(i), i) for i in range(ports)
+    )
+    outputs["show running-config"] = body + "\n" + interfaces + end
+    return outputs
+
+
+def measure(func, repeat):
+    """Run func repeat times, return the timings and the last result."""
+    timings = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = func()
+        timings.append(time.perf_counter() - start)
+    return timings, result
+
+
+def _count(result):
+    if isinstance(result, (list, dict)):
+        return len(result)
+    return 1
+
+
+def run(ports=52, macs=30000, latency=0.0, repeat=5, model="m4250"):
+    outputs = scale_outputs(load_fixtures(model=model), ports, macs)
+    results = {}
+
+    def driver():
+        device = NetgearDriver("fake", "admin", "admin")
+        device.device = FakeDevice(outputs, latency=latency)
+        return device
+
+    status = outputs["show interfaces status all"].splitlines()
+    mac_table = outputs["show mac-addr-table"].splitlines()
+    interface = outputs["show interface"].splitlines()
+    cases = [
+        ("parseFixedLenght status", lambda: parseFixedLenght(
+            ["name", "label", "state", "", "speed"], status)),
+        ("parseFixedLenght mac-addr-table", lambda: parseFixedLenght(
+            ["vlan", "mac", "interface", "", "status"], mac_table)),
+        ("parseList interface", lambda: parseList(interface)),
+    ]
+    for getter in ("get_facts", "get_interfaces", "get_interfaces_counters",
+                   "get_mac_address_table", "get_interfaces_ip", "get_config"):
+        cases.append((getter, lambda getter=getter: getattr(driver(), getter)()))
+    cases.append(("iter_mac_address_table", lambda: list(driver().iter_mac_address_table())))
+    cases.append(("get_snapshot", lambda: driver().get_snapshot()))
+
+    for name, func in cases:
+        timings, result = measure(func, repeat)
+        median = statistics.median(timings)
+        items = _count(result)
+        results[name] = {
+            "min": min(timings),
+            "median": median,
+            "items": items,
+            "items_per_second": items / median if median else 0.0,
+        }
+    return results
+
+
+def report(results, baseline=None):
+    print("%-34s %12s %12s %10s %14s%s" % (
+        "benchmark", "min [ms]", "median [ms]", "items", "items/s",
+        "  vs baseline" if baseline else ""))
+    for name, res in results.items():
+        line = "%-34s %12.3f %12.3f %10d %14.0f" % (
+            name, res["min"] * 1000, res["median"] * 1000, res["items"], res["items_per_second"])
+        if baseline and name in baseline:
+            line += "  %6.2fx" % (baseline[name]["median"] / res["median"])
+        print(line)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--model", choices=("m4250", "m4300"), default="m4250",
+                        help="recorded fixtures to start from")
+    parser.add_argument("--ports", type=int, default=52)
+    parser.add_argument("--macs", type=int, default=30000)
+    parser.add_argument("--latency", type=float, default=0.0,
+                        help="simulated seconds per prompt round-trip")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--json", help="write the results to this file")
+    parser.add_argument("--compare", help="JSON results of an earlier run")
+    args = parser.parse_args(argv)
+
+    results = run(args.ports, args.macs, args.latency, args.repeat, args.model)
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)["results"]
+    report(results, baseline)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump({"args": vars(args), "results": results}, f, indent=2)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,118 @@
+"""In-process stand-in for a netmiko connection replaying recorded CLI output."""
+import os
+import time
+
+FIXTURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+
+PROMPT = "(M4250-26G4XF-PoE+) #"
+
+INVALID = "\n% Invalid input detected at '^' marker.\n"
+
+
+def load_fixtures(path=FIXTURES, model=None):
+    """Return the recorded outputs keyed by command.
+
+    File names are the command with spaces replaced by "_". The top level
+    fixtures are an M4250, those of other models are in a subdirectory
+    named like the model (e.g. "m4300") and replace the M4250 ones.
+    """
+    outputs = {}
+    for name in os.listdir(path):
+        if name.endswith(".txt"):
+            with open(os.path.join(path, name)) as f:
+                outputs[name[:-4].replace("_", " ")] = f.read()
+    if model is not None and model != "m4250":
+        outputs.update(load_fixtures(os.path.join(path, model)))
+    return outputs
+
+
+class _Transport(object):
+    def __init__(self, device):
+        self.device = device
+
+    def is_active(self):
+        return self.device.connected
+
+
+class _RemoteConn(object):
+    def __init__(self, device):
+        self.transport = _Transport(device)
+
+
+class FakeDevice(object):
+    """Replays recorded output through the netmiko calls the driver uses.
+
+    "show interface <port>" is answered with the "show interface" fixture,
+    "show running-config all" and "show startup-config" with the running
+    config. Lines written to the channel that are not show commands are
+    treated as config lines and rejected if they are in reject.
+    latency seconds are slept once per prompt round-trip, i.e. per
+    send_command and per write_channel, to model a slow management CPU.
+    Output is handed out by read_channel in chunks of chunk_size bytes.
+    """
+
+    RETURN = "\r"
+
+    def __init__(self, outputs=None, prompt=PROMPT, latency=0.0, chunk_size=4096, reject=()):
+        self.outputs = load_fixtures() if outputs is None else outputs
+        self.prompt = prompt
+        self.latency = latency
+        self.chunk_size = chunk_size
+        self.reject = set(reject)
+        self.connected = True
+        self.remote_conn = _RemoteConn(self)
+        self.commands = []
+        self._buffer = ""
+        self._pos = 0
+
+    def output(self, command):
+        self.commands.append(command)
+        if command in self.outputs:
+            return self.outputs[command]
+        if command.startswith("show interface ") and "show interface" in self.outputs:
+            return self.outputs["show interface"]
+        if command in ("show running-config all", "show startup-config"):
+            return self.outputs.get("show running-config", INVALID)
+        return INVALID
+
+    def send_command(self, command_string, **kwargs):
+        if self.latency:
+            time.sleep(self.latency)
+        return self.output(command_string)
+
+    def find_prompt(self, **kwargs):
+        return self.prompt
+
+    def clear_buffer(self, **kwargs):
+        data = self._buffer[self._pos:]
+        self._buffer = ""
+        self._pos = 0
+        return data
+
+    def write_channel(self, out_data):
+        if self.latency:
+            time.sleep(self.latency)
+        for command in out_data.split(self.RETURN)[:-1]:
+            if command.startswith("show "):
+                output = self.output(command)
+            else:
+                self.commands.append(command)
+                output = INVALID if command in self.reject else ""
+            self._buffer += "%s\n%s\n%s" % (command, output, self.prompt)
+
+    def read_channel(self):
+        data = self._buffer[self._pos:self._pos + self.chunk_size]
+        self._pos += len(data)
+        return data
+
+    def send_config_set(self, config_commands=None, **kwargs):
+        if self.latency:
+            time.sleep(self.latency * len(config_commands))
+        self.commands.extend(config_commands)
+        return ""
+
+    def save_config(self, **kwargs):
+        return ""
+
+    def disconnect(self):
+        self.connected = False
@@ -1,3 +1,19 @@
-from napalm_netgear.netgear import NetgearDriver  # noqa
+"""NAPALM module for Netgear ProSafe switches.
 
-__all__ = ('NetgearDriver',)
\ No newline at end of file
+NetgearDriver, and with it napalm, netmiko and paramiko, is imported on
+first access, so the parser modules can be used without them.
+"""
+
+__all__ = ('NetgearDriver',)
+
+
+def __getattr__(name):
+    if name == "NetgearDriver":
+        from napalm_netgear.netgear import NetgearDriver
+        globals()["NetgearDriver"] = NetgearDriver
+        return NetgearDriver
+    raise AttributeError("module %r has no attribute %r" % (__name__, name))
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
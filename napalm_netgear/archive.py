@@ -0,0 +1,145 @@
+"""Streaming config backups, optionally compressed and deduplicated by content."""
+import gzip
+import hashlib
+import io
+import os
+import tempfile
+import time
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+EXTENSIONS = {None: "", "gzip": ".gz", "zstd": ".zst"}
+
+
+def _compression(path):
+    if path.endswith(".gz"):
+        return "gzip"
+    if path.endswith(".zst"):
+        return "zstd"
+    return None
+
+
+def _compressor(fileobj, compression):
+    """Return a binary file object compressing into fileobj."""
+    if compression is None:
+        return fileobj
+    if compression == "gzip":
+        return gzip.GzipFile(fileobj=fileobj, mode="wb")
+    if compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires zstandard, install napalm_netgear[zstd]")
+        return zstandard.ZstdCompressor().stream_writer(fileobj, closefd=False)
+    raise ValueError("unknown compression %r" % compression)
+
+
+def writeConfig(lines, sink, compression=None):
+    """Write lines to sink and return the sha256 hex digest of the text.
+
+    sink is a path, compressed according to its extension (.gz, .zst) if
+    compression is None, or a binary or text file object. Only one line is
+    held in memory at a time.
+    """
+    digest = hashlib.sha256()
+    if isinstance(sink, str):
+        if compression is None:
+            compression = _compression(sink)
+        with open(sink, "wb") as f:
+            _write(lines, f, compression, digest)
+    elif isinstance(sink, io.TextIOBase):
+        if compression is not None:
+            raise ValueError("can not compress into a text file")
+        for line in lines:
+            sink.write(line + "\n")
+            digest.update((line + "\n").encode())
+    else:
+        _write(lines, sink, compression, digest)
+    return digest.hexdigest()
+
+
+def _write(lines, fileobj, compression, digest):
+    writer = _compressor(fileobj, compression)
+    for line in lines:
+        data = (line + "\n").encode()
+        digest.update(data)
+        writer.write(data)
+    if writer is not fileobj:
+        writer.close()
+
+
+def readConfig(path):
+    """Yield the lines of a config written by writeConfig to path."""
+    compression = _compression(path)
+    if compression == "gzip":
+        f = gzip.open(path, "rt")
+    elif compression == "zstd":
+        if zstandard is None:
+            raise ImportError("zstd compression requires zstandard, install napalm_netgear[zstd]")
+        f = io.TextIOWrapper(zstandard.ZstdDecompressor().stream_reader(open(path, "rb")))
+    else:
+        f = open(path)
+    with f:
+        for line in f:
+            yield line.rstrip("\n")
+
+
+class ConfigArchive(object):
+    """Directory of config backups storing identical configs only once.
+
+    Every distinct config is kept as objects/<sha256><extension>, and every
+    store is appended as "<time> <sha256>" to hosts/<hostname>.<kind>, so the
+    backups of many equal stacks, or nights without changes, cost one line.
+    """
+
+    def __init__(self, root, compression="gzip"):
+        self.root = root
+        self.compression = compression
+        self.objects = os.path.join(root, "objects")
+        self.hosts = os.path.join(root, "hosts")
+        os.makedirs(self.objects, exist_ok=True)
+        os.makedirs(self.hosts, exist_ok=True)
+
+    def path(self, digest):
+        return os.path.join(self.objects, digest + EXTENSIONS[self.compression])
+
+    def store(self, hostname, lines, kind="running"):
+        """Stream the config lines into the archive and return their digest."""
+        fd, tmp = tempfile.mkstemp(dir=self.objects, suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                digest = hashlib.sha256()
+                _write(lines, f, self.compression, digest)
+                digest = digest.hexdigest()
+            if os.path.exists(self.path(digest)):
+                os.remove(tmp)
+            else:
+                os.replace(tmp, self.path(digest))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        with open(self._log(hostname, kind), "a") as f:
+            f.write("%s %s\n" % (time.strftime("%Y-%m-%dT%H:%M:%S"), digest))
+        return digest
+
+    def history(self, hostname, kind="running"):
+        """Return the (time, digest) of all stores of a host, oldest first."""
+        try:
+            with open(self._log(hostname, kind)) as f:
+                return [tuple(line.split()) for line in f if line.strip()]
+        except FileNotFoundError:
+            return []
+
+    def latest(self, hostname, kind="running"):
+        """Return the digest of the last stored config of a host or None."""
+        history = self.history(hostname, kind)
+        return history[-1][1] if history else None
+
+    def lines(self, digest):
+        """Yield the lines of a stored config."""
+        return readConfig(self.path(digest))
+
+    def _log(self, hostname, kind):
+        return os.path.join(self.hosts, "%s.%s" % (hostname.replace(os.sep, "_"), kind))
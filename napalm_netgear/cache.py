@@ -0,0 +1,48 @@
+"""Per-session cache for show command output."""
+import time
+from collections import OrderedDict
+
+
+class CommandCache(object):
+    """Bounded LRU cache of command output with a time to live.
+
+    Entries older than ttl seconds are treated as missing. When more than
+    size entries are stored the least recently used one is dropped.
+    """
+
+    def __init__(self, ttl=30, size=128):
+        self.ttl = ttl
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def get(self, key):
+        """Return the cached output for key or None."""
+        entry = self._entries.get(key)
+        if entry is not None:
+            stored, output = entry
+            if time.monotonic() - stored <= self.ttl:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return output
+            del self._entries[key]
+        self.misses += 1
+        return None
+
+    def set(self, key, output):
+        self._entries[key] = (time.monotonic(), output)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self):
+        """Drop all entries, statistics are kept."""
+        self._entries.clear()
+
+    def stats(self):
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "size": len(self._entries),
+        }
@@ -0,0 +1,158 @@
+"""Additional shell channels over the SSH transport of a netmiko session."""
+import codecs
+import re
+import socket
+import threading
+import time
+
+# end of a prompt of the exec modes
+PROMPT_PATTERN = re.compile(r"[>#]\s*$")
+PASSWORD_PATTERN = re.compile(r"(Password:|#)\s*$")
+
+# upper bound of channels per device, the switches allow few SSH sessions
+MAX_CHANNELS = 8
+
+
+class ShellChannel(object):
+    """An interactive shell on a new channel of an authenticated transport.
+
+    The shell is brought into privileged exec mode, paging disabled, like
+    netmiko does in the session preparation of the netgear_prosafe driver.
+    """
+
+    RETURN = "\r"
+
+    def __init__(self, transport, secret="", timeout=60):
+        self.timeout = timeout
+        self.channel = transport.open_session()
+        self.channel.settimeout(timeout)
+        self.channel.get_pty(width=511, height=1000)
+        self.channel.invoke_shell()
+        self._decoder = codecs.getincrementaldecoder("utf-8")("replace")
+        self.prompt = None
+        output = self._send("", PROMPT_PATTERN)
+        if output.rstrip().endswith(">"):
+            if PASSWORD_PATTERN.search(self._send("enable", PASSWORD_PATTERN)).group(1) != "#":
+                self._send(secret, PROMPT_PATTERN)
+        output = self._send("terminal length 0", PROMPT_PATTERN)
+        self.prompt = output.rstrip().splitlines()[-1].strip()
+
+    def _send(self, command, pattern):
+        self.channel.sendall((command + self.RETURN).encode())
+        output = ""
+        deadline = time.monotonic() + self.timeout
+        while pattern.search(output) is None:
+            if time.monotonic() > deadline:
+                raise socket.timeout("timed out waiting for %r" % pattern.pattern)
+            output += self._recv()
+        return output
+
+    def _recv(self):
+        data = self.channel.recv(65535)
+        if not data:
+            raise EOFError("channel closed")
+        return self._decoder.decode(data)
+
+    def send_command(self, command, timeout=None):
+        """Run a show command and return its output without echo and prompt.
+
+        Times out after timeout seconds, by default self.timeout, without new data.
+        """
+        self.channel.sendall((command + self.RETURN).encode())
+        chunks = []
+        tail = ""
+        self.channel.settimeout(self.timeout if timeout is None else timeout)
+        try:
+            while True:
+                data = self._recv()
+                chunks.append(data)
+                window = tail + data
+                if self.prompt in window:
+                    break
+                tail = window[max(0, len(window) - len(self.prompt) + 1):]
+        except socket.timeout:
+            raise socket.timeout("timed out waiting for prompt %s" % self.prompt)
+        finally:
+            self.channel.settimeout(self.timeout)
+        output = "".join(chunks)
+        output = output[:output.rindex(self.prompt)].replace("\r\n", "\n").replace("\r", "\n")
+        # the first line is the echo of the command
+        lines = output.split("\n", 1)
+        return lines[1] if len(lines) > 1 else ""
+
+    def close(self):
+        self.channel.close()
+
+
+class ChannelGroup(object):
+    """Run show commands spread over several ShellChannel of one transport.
+
+    Every channel is served by its own thread taking the next command in
+    order, so the device works on up to len(channels) commands at once.
+    size is capped at MAX_CHANNELS. If the device refuses some of the
+    channels the group works with those it got.
+    """
+
+    def __init__(self, transport, size, secret="", timeout=60):
+        self.channels = []
+        for _ in range(min(size, MAX_CHANNELS)):
+            try:
+                self.channels.append(ShellChannel(transport, secret, timeout))
+            except Exception:
+                if not self.channels:
+                    raise
+                break
+
+    def send_commands(self, commands, callback=None, timeout=None):
+        """Return the outputs of the commands in the same order.
+
+        callback(command, seconds, output) is called for every command.
+        timeout(command) returns the read timeout of a command, by default
+        the timeout of the channels is used. The first error of any channel
+        is raised after all threads ended.
+        """
+        res = [None] * len(commands)
+        errors = []
+        lock = threading.Lock()
+        pending = iter(range(len(commands)))
+
+        def worker(channel):
+            while True:
+                with lock:
+                    if errors:
+                        return
+                    index = next(pending, None)
+                if index is None:
+                    return
+                try:
+                    start = time.perf_counter()
+                    res[index] = channel.send_command(
+                        commands[index], None if timeout is None else timeout(commands[index])
+                    )
+                    if callback is not None:
+                        with lock:
+                            callback(commands[index], time.perf_counter() - start, res[index])
+                except Exception as e:
+                    with lock:
+                        errors.append(e)
+                    return
+
+        threads = [
+            threading.Thread(target=worker, args=(channel,), daemon=True)
+            for channel in self.channels[:len(commands)]
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        if errors:
+            raise errors[0]
+        return res
+
+    def close(self):
+        for channel in self.channels:
+            try:
+                channel.close()
+            except Exception:
+                pass
+        self.channels = []
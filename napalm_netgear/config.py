@@ -0,0 +1,286 @@
+"""Tree representation and structural diff of Netgear ProSafe configs."""
+import re
+
+# lines opening a block that is closed by "exit", also when not indented
+BLOCK_PATTERN = re.compile(
+    r"^(configure|vlan database|stack|spanning-tree mst configuration"
+    r"|interface .+|line .+|router .+|ipv6 router .+"
+    r"|(ip|ipv6|mac) access-list .+|policy-map .+|class-map .+|class .+"
+    r"|(ip|ipv6) dhcp pool .+)$"
+)
+
+# blocks that can not be removed with "no", their content is negated instead
+PERMANENT_BLOCK_PATTERN = re.compile(r"^(configure|vlan database|stack|interface .+|line .+)$")
+
+
+class ConfigNode(object):
+    """A config line and, if it opens a block, the lines inside it."""
+
+    __slots__ = ("line", "children")
+
+    def __init__(self, line=""):
+        self.line = line
+        self.children = {}
+
+    def add(self, line):
+        node = self.children.get(line)
+        if node is None:
+            node = self.children[line] = ConfigNode(line)
+        return node
+
+    def commands(self):
+        """Return the lines needed to create this node, blocks closed with exit."""
+        res = [self.line]
+        if self.children:
+            for child in self.children.values():
+                res.extend(child.commands())
+            res.append("exit")
+        return res
+
+    def negate(self):
+        """Return the lines needed to remove this node."""
+        if not self.children:
+            return [_negate(self.line)]
+        if PERMANENT_BLOCK_PATTERN.match(self.line) is None:
+            return ["no " + self.line]
+        res = [self.line]
+        for child in self.children.values():
+            res.extend(child.negate())
+        res.append("exit")
+        return res
+
+
+# commands adding VLANs to a list instead of replacing it, and the command
+# removing VLANs from that list again
+ADDITIVE_COMMANDS = {
+    "vlan": "no vlan",
+    "vlan participation include": "vlan participation auto",
+    "vlan participation exclude": "vlan participation auto",
+    "vlan tagging": "no vlan tagging",
+}
+
+# "1,10,20-22"
+MEMBERS_PATTERN = re.compile(r"^\d+(-\d+)?(,\d+(-\d+)?)*$")
+
+# settings with a single value whose key is not all words but the last,
+# "no <key>" removes them
+SETTING_PATTERNS = [
+    re.compile(r"^(description)\s"),
+    re.compile(r"^(hostname)\s"),
+    re.compile(r"^(network parms)\s"),
+    re.compile(r"^(username (\"[^\"]*\"|\S+))\s"),
+    re.compile(r"^(vlan name \d+)\s"),
+    re.compile(r"^(vlan pvid)\s"),
+]
+
+
+def _negate(line):
+    key = _key(line)
+    if key in ADDITIVE_COMMANDS:
+        return ADDITIVE_COMMANDS[key] + line[len(key):]
+    if line.startswith("no "):
+        return line[3:]
+    if _setting(line) is not None:
+        return "no " + key
+    return "no " + line
+
+
+KEY_PATTERN = re.compile(r"^(.*?)\s+(\"[^\"]*\"|'[^']*'|\S+)$")
+
+
+def _setting(line):
+    """Return the key of a line matching SETTING_PATTERNS, None for other lines."""
+    for pattern in SETTING_PATTERNS:
+        match = pattern.match(line)
+        if match is not None:
+            return match.group(1)
+    return None
+
+
+def _key(line):
+    """Setting a line overrides the line with the same key.
+
+    The key is given by SETTING_PATTERNS, or else it is all words but the last.
+    """
+    key = _setting(line)
+    if key is not None:
+        return key
+    match = KEY_PATTERN.match(line)
+    if match is None:
+        return line
+    return match.group(1)
+
+
+def _members(line):
+    """Return the set of VLANs of an additive command, None if they can not be parsed."""
+    value = line[len(_key(line)):].strip()
+    if MEMBERS_PATTERN.match(value) is None:
+        return None
+    members = set()
+    for part in value.split(","):
+        first, _, last = part.partition("-")
+        members.update(range(int(first), int(last or first) + 1))
+    return members
+
+
+def _memberList(members):
+    """Return a set of VLANs as "1,10,20-22"."""
+    res = []
+    for member in sorted(members):
+        if res and res[-1][1] == member - 1:
+            res[-1][1] = member
+        else:
+            res.append([member, member])
+    return ",".join(
+        str(first) if first == last else "%d-%d" % (first, last) for first, last in res
+    )
+
+
+def _common(path, other):
+    """Return the length of the common prefix of two paths."""
+    common = 0
+    while common < min(len(path), len(other)) and path[common] == other[common]:
+        common += 1
+    return common
+
+
+def parseConfig(text):
+    """Parse a config into a tree of ConfigNode.
+
+    Blocks are closed by "exit" or, for indented configs, by a line not
+    indented deeper than the block. Comments and blank lines are skipped.
+    """
+    root = ConfigNode()
+    lines = [
+        line.rstrip() for line in text.splitlines()
+        if line.strip() and not line.lstrip().startswith("!")
+    ]
+    # stack of (node, indent of its line, closed by dedent)
+    stack = [(root, -1, False)]
+    for i, raw in enumerate(lines):
+        line = raw.lstrip()
+        indent = len(raw) - len(line)
+        while len(stack) > 1 and stack[-1][2] and indent <= stack[-1][1]:
+            stack.pop()
+        if line == "exit":
+            if len(stack) > 1:
+                stack.pop()
+            continue
+        node = stack[-1][0].add(line)
+        next_indent = -1
+        if i + 1 < len(lines):
+            next_indent = len(lines[i + 1]) - len(lines[i + 1].lstrip())
+        if next_indent > indent or BLOCK_PATTERN.match(line):
+            stack.append((node, indent, next_indent > indent))
+    return root
+
+
+def compareConfig(running, candidate, replace=True):
+    """Return the differences of two config trees.
+
+    Returns a list of (path, sign, node) with path the tuple of block lines
+    containing node, sign "+" for lines only in candidate and "-" for lines
+    only in running. Without replace removed lines are not reported.
+    """
+    res = []
+    _compare(running, candidate, (), replace, res)
+    return res
+
+
+def _compare(running, candidate, path, replace, res):
+    if replace:
+        for line, node in running.children.items():
+            if line not in candidate.children:
+                res.append((path, "-", node))
+    for line, node in candidate.children.items():
+        if line not in running.children:
+            res.append((path, "+", node))
+    for line, node in candidate.children.items():
+        other = running.children.get(line)
+        if other is not None and (node.children or other.children):
+            _compare(other, node, path + (line,), replace, res)
+
+
+def configDiff(changes):
+    """Return the changes of compareConfig as text, an empty string if there are none."""
+    res = []
+    current = ()
+    for path, sign, node in changes:
+        if path != current:
+            for depth in range(_common(path, current), len(path)):
+                res.append("  " + "  " * depth + path[depth])
+            current = path
+        depth = len(path)
+        for line in _tree(node):
+            res.append(sign + " " + "  " * depth + line)
+    return "\n".join(res)
+
+
+def _tree(node, depth=0):
+    res = ["  " * depth + node.line]
+    for child in node.children.values():
+        res.extend(_tree(child, depth + 1))
+    return res
+
+
+def configCommands(changes):
+    """Return the config lines applying the changes of compareConfig.
+
+    The lines start and end in privileged exec mode. A removed line is only
+    negated if no added line of the same block overrides it. The commands in
+    ADDITIVE_COMMANDS do not override, for them the VLANs no added line
+    lists again are removed. Removals are sent after the additions of their
+    block, so that e.g. a user or the management address is replaced rather
+    than missing in between, and in reverse order.
+    """
+    res = []
+    groups = []
+    for path, sign, node in changes:
+        if not groups or groups[-1][0] != path:
+            groups.append((path, [], []))
+        (groups[-1][1] if sign == "-" else groups[-1][2]).append(node)
+    current = ()
+    for path, removed, added in groups:
+        common = _common(path, current)
+        res.extend(["exit"] * (len(current) - common))
+        res.extend(path[common:])
+        current = path
+        overridden = set()
+        # additive command -> VLANs set by the added lines, None if unknown
+        members = {}
+        for node in added:
+            if node.children:
+                continue
+            key = _key(node.line)
+            if key not in ADDITIVE_COMMANDS:
+                overridden.add(key)
+                continue
+            added_members = _members(node.line)
+            if key in members:
+                if None in (members[key], added_members):
+                    added_members = None
+                else:
+                    added_members |= members[key]
+            members[key] = added_members
+        negated = []
+        for node in removed:
+            key = _key(node.line)
+            if node.children or key not in ADDITIVE_COMMANDS:
+                if node.children or key not in overridden:
+                    negated.append(node.negate())
+                continue
+            removed_members = _members(node.line)
+            if removed_members is None or members.get(key, set()) is None:
+                # can not tell which VLANs stay, remove all before adding them again
+                res.append(_negate(node.line))
+                continue
+            dropped = removed_members - members.get(key, set())
+            if dropped:
+                negated.append([_negate(key + " " + _memberList(dropped))])
+        for node in added:
+            res.extend(node.commands())
+        # later lines may depend on earlier ones, like the name on its VLAN
+        for lines in reversed(negated):
+            res.extend(lines)
+    res.extend(["exit"] * len(current))
+    return res
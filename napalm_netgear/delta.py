@@ -0,0 +1,93 @@
+"""Changes of getter results between polls."""
+import hashlib
+
+MASK64 = (1 << 64) - 1
+
+
+def digest(text):
+    """Return a digest of a command output."""
+    return hashlib.blake2b(text.encode(), digest_size=16).digest()
+
+
+class DeltaTracker(object):
+    """Keep the last result of a getter and report what changed since.
+
+    Entries are {key: entry dict}. They are kept in groups (e.g. per VLAN
+    or per port) with an order independent digest of their entries, and
+    only groups with a new digest are compared entry by entry. If the raw
+    output of the device has the digest of the last update, nothing is
+    parsed at all. The first update reports every entry as added.
+    """
+
+    def __init__(self, group=None):
+        # group(key, entry) -> group of an entry, one group if None
+        self.group = group
+        self.reset()
+
+    def reset(self):
+        self.raw_digest = None
+        # group -> (digest, {key: (hash, entry)})
+        self.groups = {}
+
+    def update(self, parse, raw=None):
+        """Return {"added", "removed", "changed"} dicts of {key: entry}.
+
+        parse() returns the new entries, it is not called if raw is given
+        and did not change since the last update.
+        """
+        res = {"added": {}, "removed": {}, "changed": {}}
+        if raw is not None:
+            raw_digest = digest(raw)
+            if raw_digest == self.raw_digest:
+                return res
+        else:
+            raw_digest = None
+        groups = {}
+        for key, entry in parse().items():
+            name = None if self.group is None else self.group(key, entry)
+            entries = groups.get(name)
+            if entries is None:
+                entries = groups[name] = [0, {}]
+            value = hash((key, tuple(entry.items())))
+            entries[0] = (entries[0] + value) & MASK64
+            entries[1][key] = (value, entry)
+        added = res["added"]
+        removed = res["removed"]
+        for name, (group_digest, entries) in groups.items():
+            old = self.groups.get(name)
+            if old is not None and old[0] == group_digest:
+                continue
+            old_entries = old[1] if old is not None else {}
+            for key, (value, entry) in entries.items():
+                old_value = old_entries.get(key)
+                if old_value is None:
+                    added[key] = entry
+                elif old_value[0] != value:
+                    res["changed"][key] = entry
+            for key, (value, entry) in old_entries.items():
+                if key not in entries:
+                    removed[key] = entry
+        for name, (group_digest, entries) in self.groups.items():
+            if name not in groups:
+                for key, (value, entry) in entries.items():
+                    removed[key] = entry
+        # entries that moved to another group
+        for key in [key for key in added if key in removed]:
+            entry = added.pop(key)
+            if entry != removed.pop(key):
+                res["changed"][key] = entry
+        self.groups = dict((name, tuple(entries)) for name, entries in groups.items())
+        self.raw_digest = raw_digest
+        return res
+
+    def snapshot(self):
+        """Return the entries of the last update as {key: entry}."""
+        res = {}
+        for group_digest, entries in self.groups.values():
+            for key, (value, entry) in entries.items():
+                res[key] = entry
+        return res
+
+    def digests(self):
+        """Return {group: digest} of the last update, only comparable within a process."""
+        return dict((name, group[0]) for name, group in self.groups.items())
@@ -0,0 +1,189 @@
+"""Run NetgearDriver getters against many switches concurrently."""
+import threading
+import time
+from collections import namedtuple
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from napalm.base.exceptions import CommandTimeoutException
+
+from .netgear import NetgearDriver
+
+FleetResult = namedtuple("FleetResult", ["hostname", "results", "errors", "elapsed"])
+FleetResult.__doc__ = """Outcome of one host.
+
+results maps getter names to their return value, errors maps getter names
+(or "open" if the connection failed) to the raised exception.
+"""
+
+
+class FleetRunner(object):
+    """Open drivers in a thread pool and run a list of getters on each host.
+
+    Inventory entries are dicts with hostname, username and password and
+    optionally timeout and optional_args. The timeout is passed to the
+    driver and also bounds the whole host: when it expires a watchdog
+    closes the session, which interrupts the running getter, and that
+    getter and those not started yet are reported as
+    CommandTimeoutException. open() cannot be interrupted, it is bounded
+    by the connect timeout of the driver, and the getters are skipped if
+    it only returned after the host timeout.
+
+    With a ConnectionPool sessions are taken from and returned to the pool
+    instead of being opened and closed for every run.
+
+    run_host() runs the getters of one host in the calling thread and
+    session() hands out the session of a host, both with the host timeout.
+    """
+
+    def __init__(self, max_workers=16, timeout=60, optional_args=None, driver=NetgearDriver,
+                 pool=None):
+        self.max_workers = max_workers
+        self.timeout = timeout
+        self.optional_args = optional_args or {}
+        self.driver = driver
+        self.pool = pool
+
+    def run(self, inventory, getters):
+        """Yield a FleetResult for every host as soon as it is finished."""
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = [executor.submit(self.run_host, host, getters) for host in inventory]
+            for future in as_completed(futures):
+                yield future.result()
+
+    def run_host(self, host, getters):
+        """Run getters on the host of an inventory entry and return its FleetResult."""
+        start = time.monotonic()
+        results = {}
+        errors = {}
+        session = None
+        try:
+            with self.session(host) as session:
+                for getter in getters:
+                    try:
+                        results[getter] = session.run(getter)
+                    except Exception as e:
+                        errors[getter] = e
+        except Exception as e:
+            if session is not None:
+                raise
+            errors["open"] = e
+        return FleetResult(host["hostname"], results, errors, time.monotonic() - start)
+
+    @contextmanager
+    def session(self, host):
+        """Context manager handing out a HostSession of an inventory entry.
+
+        The host timeout runs from the start of the block. The session is
+        discarded instead of returned to the pool if a getter failed, the
+        block raised or the timeout expired.
+        """
+        timeout = host.get("timeout", self.timeout)
+        optional_args = dict(self.optional_args)
+        optional_args.update(host.get("optional_args", {}))
+        watchdog = _Watchdog(timeout)
+        try:
+            device = self._open(host, timeout, optional_args)
+        except Exception:
+            watchdog.cancel()
+            raise
+        watchdog.watch(device)
+        session = HostSession(host["hostname"], device, timeout, watchdog)
+        try:
+            yield session
+        except Exception:
+            session.failed = True
+            raise
+        finally:
+            watchdog.cancel()
+            self._close(device, discard=session.failed or watchdog.expired)
+
+    def _open(self, host, timeout, optional_args):
+        if self.pool is not None:
+            return self.pool.acquire(
+                host["hostname"], host["username"], host["password"],
+                timeout=timeout, optional_args=optional_args
+            )
+        device = self.driver(
+            host["hostname"], host["username"], host["password"],
+            timeout=timeout, optional_args=optional_args
+        )
+        device.open()
+        return device
+
+    def _close(self, device, discard=False):
+        if self.pool is not None:
+            self.pool.release(device, discard=discard)
+            return
+        try:
+            device.close()
+        except Exception:
+            pass
+
+
+class HostSession(object):
+    """Open session of one host, see FleetRunner.session()."""
+
+    def __init__(self, hostname, device, timeout, watchdog):
+        self.hostname = hostname
+        self.device = device
+        self.timeout = timeout
+        self.failed = False
+        self._watchdog = watchdog
+
+    @property
+    def expired(self):
+        """True once the host timeout expired and the session was closed."""
+        return self._watchdog.expired
+
+    def run(self, getter, **kwargs):
+        """Return the result of a getter.
+
+        :raise CommandTimeoutException: If the host timeout expired before or
+            while it ran.
+        """
+        try:
+            if self.expired:
+                raise CommandTimeoutException()
+            return getattr(self.device, getter)(**kwargs)
+        except Exception as e:
+            self.failed = True
+            if self.expired:
+                raise CommandTimeoutException(
+                    "%s: host timeout of %ss expired" % (self.hostname, self.timeout)
+                ) from e
+            raise
+
+
+class _Watchdog(object):
+    """Close the watched device once timeout seconds have passed."""
+
+    def __init__(self, timeout):
+        self.expired = False
+        self._device = None
+        self._lock = threading.Lock()
+        self._timer = threading.Timer(timeout, self._expire)
+        self._timer.daemon = True
+        self._timer.start()
+
+    def watch(self, device):
+        with self._lock:
+            self._device = device
+
+    def cancel(self):
+        """Stop the timer, expired is final afterwards."""
+        self._timer.cancel()
+        with self._lock:
+            self._device = None
+
+    def _expire(self):
+        with self._lock:
+            self.expired = True
+            device = self._device
+        if device is None:
+            return
+        # the worker still owns the session, it is discarded when it is released
+        try:
+            device.close()
+        except Exception:
+            pass
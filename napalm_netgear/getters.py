@@ -0,0 +1,235 @@
+"""Parsing of CLI output into the results of the NAPALM getters."""
+import fnmatch
+import re
+
+from .parser import iterFixedLenght, parseList
+
+MAP_INTERFACE_SPEED = {
+    "10G Full": 10*1000,
+    "1000 Full": 1000,
+    "100 Full": 100,
+    "100 Half": 100,
+    "10 Full": 10,
+    "10 Half": 10,
+}
+
+MAP_SUBNETMASK_PREFIXLENGTH = {
+    "0.0.0.0":	        0,
+    "128.0.0.0":	    1,
+    "192.0.0.0":	    2,
+    "224.0.0.0":	    3,
+    "240.0.0.0":	    4,
+    "248.0.0.0":	    5,
+    "252.0.0.0":	    6,
+    "254.0.0.0":	    7,
+    "255.0.0.0":	    8,
+    "255.128.0.0":	    9,
+    "255.192.0.0":      10,
+    "255.224.0.0":	    11,
+    "255.240.0.0":	    12,
+    "255.248.0.0":	    13,
+    "255.252.0.0":	    14,
+    "255.254.0.0":	    15,
+    "255.255.0.0":	    16,
+    "255.255.128.0":	17,
+    "255.255.192.0":	18,
+    "255.255.224.0":	19,
+    "255.255.240.0":	20,
+    "255.255.248.0":	21,
+    "255.255.252.0":	22,
+    "255.255.254.0":	23,
+    "255.255.255.0":	24,
+    "255.255.255.128":	25,
+    "255.255.255.192":	26,
+    "255.255.255.224":	27,
+    "255.255.255.240":	28,
+    "255.255.255.248":	29,
+    "255.255.255.252":	30,
+    "255.255.255.254":	31,
+    "255.255.255.255":	32
+}
+
+STATUS_COMMAND = "show interfaces status all"
+INTERFACE_COMMAND = "show interface %s"
+
+# commands whose output a getter parses, per-port commands of
+# get_interfaces_counters come from counterCommands()
+GETTER_COMMANDS = {
+    "get_facts": ("show ver", "show sysinfo", STATUS_COMMAND),
+    "get_interfaces": (STATUS_COMMAND,),
+    "get_interfaces_counters": (STATUS_COMMAND,),
+    "get_interfaces_ip": ("show ip interface brief",),
+    "get_mac_address_table": ("show mac-addr-table",),
+}
+
+# "11 days 1 hrs 50 mins 29 secs"
+UPTIME_PATTERN = re.compile(r"(\d+)\s*(day|hr|hour|min|sec)", re.I)
+
+UPTIME_SECONDS = {"day": 86400, "hr": 3600, "hour": 3600, "min": 60, "sec": 1}
+
+
+def isPattern(name):
+    return any(c in name for c in "*?[")
+
+
+def interfaceMatcher(interfaces):
+    """Return a function telling if an interface matches any of the names or
+    fnmatch patterns (like "0/4*") in interfaces, None if interfaces is None.
+    """
+    if interfaces is None:
+        return None
+    if isinstance(interfaces, str):
+        interfaces = [interfaces]
+    names = set(name for name in interfaces if not isPattern(name))
+    patterns = [
+        re.compile(fnmatch.translate(name)) for name in interfaces if isPattern(name)
+    ]
+
+    def match(name):
+        return name in names or any(pattern.match(name) for pattern in patterns)
+    return match
+
+
+def parseInterfaces(lines, match=None):
+    # default values.
+    last_flapped = -1.0
+
+    fields = iterFixedLenght(
+        ["name", "label", "state", "", "speed"], lines, output="tuple"
+    )
+
+    interface_dict = {}
+    for name, label, state, speed in fields:
+        if(name.startswith("lag")):
+            continue
+        if match is not None and not match(name):
+            continue
+        try:
+            speed = MAP_INTERFACE_SPEED[speed]
+        except KeyError:
+            speed = 1000
+        interface_dict[name] = {
+            "is_enabled": True,
+            "is_up": (state == "Up"),
+            "description": label,
+            "mac_address": "",
+            "last_flapped": last_flapped,
+            "mtu": 1500,
+            "speed": speed
+        }
+    return interface_dict
+
+
+def parseInterfaceNames(lines, match=None):
+    """Return the physical ports of the status table, those before the first lag."""
+    names = []
+    for name, in iterFixedLenght(["name"], lines, output="tuple"):
+        if(name.startswith("lag")):
+            break
+        if match is None or match(name):
+            names.append(name)
+    return names
+
+
+def counterCommands(status):
+    """Return the per-port commands of get_interfaces_counters for a status table."""
+    return [INTERFACE_COMMAND % name for name in parseInterfaceNames(status.splitlines())]
+
+
+def parseInterfaceCounters(lines):
+    stats = parseList(lines)
+    return {
+        'tx_errors': int(stats['Transmit Packet Errors']),
+        'rx_errors': int(stats['Packets Received With Error']),
+        'tx_discards': int(stats['Transmit Packets Discarded']),
+        'rx_discards': int(stats['Receive Packets Discarded']),
+        'tx_octets': -1,
+        'rx_octets': -1,
+        'tx_unicast_packets': int(stats['Packets Transmitted Without Errors']),
+        'rx_unicast_packets': int(stats['Packets Received Without Error']),
+        'tx_multicast_packets': -1,
+        'rx_multicast_packets': -1,
+        'tx_broadcast_packets': -1,
+        'rx_broadcast_packets': int(stats['Broadcast Packets Received']),
+    }
+
+
+def iterMacAddressTable(lines):
+    fields = iterFixedLenght(
+        ["vlan", "mac", "interface", "", "status"], lines, output="tuple"
+    )
+    for vlan, mac, interface, status in fields:
+        yield {
+            "mac": mac,
+            "interface": interface,
+            "vlan": int(vlan),
+            "active": True,
+            "static": (status == "Learned"),
+            "moves": -1,
+            "last_move": -1.0
+        }
+
+
+def parseInterfacesIp(lines):
+    interface_list = iterFixedLenght(
+        ["Interface", "", "IP Address", "IP Mask"], lines, output="tuple"
+    )
+    interfaces = {}
+    for name, address, mask in interface_list:
+        if(name == ""):
+            break
+        if(name not in interfaces):
+            interfaces[name] = {
+                "ipv4": {}
+            }
+        interfaces[name]["ipv4"][address] = {
+            "prefix_length": MAP_SUBNETMASK_PREFIXLENGTH[mask]
+        }
+    return interfaces
+
+
+def parseUptime(text):
+    """Return the seconds of an uptime like "11 days 1 hrs 50 mins 29 secs"."""
+    seconds = 0
+    for value, unit in UPTIME_PATTERN.findall(text):
+        seconds += int(value) * UPTIME_SECONDS[unit.lower()]
+    return float(seconds)
+
+
+def parseFacts(version, sysinfo, status):
+    """Return get_facts from the output of show ver, show sysinfo and the status table."""
+    fields = parseList(version.splitlines())
+    system = parseList(sysinfo.splitlines())
+    hostname = system.get("System Name", "")
+    return {
+        'uptime': parseUptime(system.get("System Up Time", "")),
+        'vendor': 'Netgear',
+        'os_version': fields["Software Version"],
+        'serial_number': fields["Serial Number"],
+        'model': fields["Machine Model"],
+        'hostname': hostname,
+        'fqdn': hostname,
+        'interface_list': list(parseInterfaces(status.splitlines()))
+    }
+
+
+def parseGetter(getter, outputs):
+    """Return the result of a getter from {command: output}.
+
+    get_interfaces_counters also needs the outputs of counterCommands().
+    """
+    if getter == "get_facts":
+        return parseFacts(*[outputs[command] for command in GETTER_COMMANDS[getter]])
+    if getter == "get_interfaces":
+        return parseInterfaces(outputs[STATUS_COMMAND].splitlines())
+    if getter == "get_interfaces_counters":
+        names = parseInterfaceNames(outputs[STATUS_COMMAND].splitlines())
+        return dict(
+            (name, parseInterfaceCounters(outputs[INTERFACE_COMMAND % name].splitlines()))
+            for name in names
+        )
+    if getter == "get_interfaces_ip":
+        return parseInterfacesIp(outputs["show ip interface brief"].splitlines())
+    if getter == "get_mac_address_table":
+        return list(iterMacAddressTable(outputs["show mac-addr-table"].splitlines()))
+    raise ValueError("unknown getter %r" % getter)
@@ -0,0 +1,118 @@
+"""Per-command latency and byte count statistics of a driver session."""
+import re
+import time
+from contextlib import contextmanager
+
+
+def command_key(command):
+    """Return command with interface names replaced by <port>.
+
+    Keeps per-port commands like "show interface 0/12" in one series.
+    """
+    return re.sub(r"(?<![\w/])\d+(/\d+)+(?![\w/])", "<port>", command)
+
+
+class CommandStats(object):
+    """Collect wall time, received bytes and retries of every command and
+    the parse time of every getter.
+
+    callback, if given, is called with a dict for every recorded event:
+    {"type": "command", "hostname", "command", "seconds", "bytes", "retries"}
+    or {"type": "parse", "hostname", "getter", "seconds"}.
+    """
+
+    def __init__(self, hostname="", callback=None):
+        self.hostname = hostname
+        self.callback = callback
+        self.reset()
+
+    def reset(self):
+        self.commands = {}
+        self.parsers = {}
+
+    def record_command(self, command, seconds, received, retries=0):
+        key = command_key(command)
+        stats = self.commands.get(key)
+        if stats is None:
+            stats = self.commands[key] = {
+                "count": 0, "seconds": 0.0, "max_seconds": 0.0, "bytes": 0, "retries": 0
+            }
+        stats["count"] += 1
+        stats["seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        stats["bytes"] += received
+        stats["retries"] += retries
+        if self.callback is not None:
+            self.callback({
+                "type": "command",
+                "hostname": self.hostname,
+                "command": command,
+                "seconds": seconds,
+                "bytes": received,
+                "retries": retries,
+            })
+
+    def record_parse(self, getter, seconds):
+        stats = self.parsers.get(getter)
+        if stats is None:
+            stats = self.parsers[getter] = {"count": 0, "seconds": 0.0, "max_seconds": 0.0}
+        stats["count"] += 1
+        stats["seconds"] += seconds
+        stats["max_seconds"] = max(stats["max_seconds"], seconds)
+        if self.callback is not None:
+            self.callback({
+                "type": "parse",
+                "hostname": self.hostname,
+                "getter": getter,
+                "seconds": seconds,
+            })
+
+    @contextmanager
+    def parse(self, getter):
+        """Context manager recording the time spent in the block as parse time."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record_parse(getter, time.perf_counter() - start)
+
+    def snapshot(self):
+        """Return a copy of the statistics."""
+        return {
+            "commands": {k: dict(v) for k, v in self.commands.items()},
+            "parse": {k: dict(v) for k, v in self.parsers.items()},
+        }
+
+    def prometheus(self):
+        """Return the statistics in the Prometheus text exposition format."""
+        host = _label(self.hostname)
+        lines = []
+        metrics = (
+            ("netgear_command_total", "counter", "Commands sent", "count"),
+            ("netgear_command_seconds_total", "counter", "Wall time of commands", "seconds"),
+            ("netgear_command_seconds_max", "gauge", "Slowest command", "max_seconds"),
+            ("netgear_command_received_bytes_total", "counter", "Bytes received", "bytes"),
+            ("netgear_command_retries_total", "counter", "Fallback commands tried", "retries"),
+        )
+        for name, kind, text, field in metrics:
+            lines.append("# HELP %s %s" % (name, text))
+            lines.append("# TYPE %s %s" % (name, kind))
+            for command, stats in sorted(self.commands.items()):
+                lines.append('%s{hostname="%s",command="%s"} %s' % (
+                    name, host, _label(command), stats[field]))
+        metrics = (
+            ("netgear_parse_total", "counter", "Getter output parses", "count"),
+            ("netgear_parse_seconds_total", "counter", "Parse time of getters", "seconds"),
+            ("netgear_parse_seconds_max", "gauge", "Slowest parse", "max_seconds"),
+        )
+        for name, kind, text, field in metrics:
+            lines.append("# HELP %s %s" % (name, text))
+            lines.append("# TYPE %s %s" % (name, kind))
+            for getter, stats in sorted(self.parsers.items()):
+                lines.append('%s{hostname="%s",getter="%s"} %s' % (
+                    name, host, _label(getter), stats[field]))
+        return "\n".join(lines) + "\n"
+
+
+def _label(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
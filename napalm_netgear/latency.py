@@ -0,0 +1,79 @@
+"""Per-command latency profile of a device, used to pick read timeouts."""
+import json
+import os
+import tempfile
+import threading
+
+from .instrumentation import command_key
+
+# serializes the read-merge-write of save() between the drivers of a process
+_save_lock = threading.Lock()
+
+
+class LatencyProfile(object):
+    """Exponentially weighted mean and deviation of the wall time of commands.
+
+    Works like the TCP retransmission timer: the timeout of a command is
+    its mean plus four deviations, times headroom, within minimum and
+    maximum. Commands are grouped by instrumentation.command_key, so all
+    "show interface <port>" share one estimate. Commands not seen yet get
+    the default timeout.
+    """
+
+    def __init__(self, alpha=0.125, beta=0.25, headroom=2.0, minimum=2.0, maximum=600.0):
+        self.alpha = alpha
+        self.beta = beta
+        self.headroom = headroom
+        self.minimum = minimum
+        self.maximum = maximum
+        # command key -> {"mean", "deviation", "count"}
+        self.commands = {}
+
+    def observe(self, command, seconds):
+        key = command_key(command)
+        estimate = self.commands.get(key)
+        if estimate is None:
+            self.commands[key] = {"mean": seconds, "deviation": seconds / 2, "count": 1}
+            return
+        estimate["deviation"] = ((1 - self.beta) * estimate["deviation"]
+                                 + self.beta * abs(estimate["mean"] - seconds))
+        estimate["mean"] = (1 - self.alpha) * estimate["mean"] + self.alpha * seconds
+        estimate["count"] += 1
+
+    def timeout(self, command, default=None):
+        """Return the read timeout for command, default if it was not seen yet."""
+        estimate = self.commands.get(command_key(command))
+        if estimate is None:
+            return default
+        timeout = self.headroom * (estimate["mean"] + 4 * estimate["deviation"])
+        return min(self.maximum, max(self.minimum, timeout))
+
+    def load(self, path, hostname):
+        """Merge the estimates of hostname saved in path, a missing file is ignored."""
+        if not os.path.exists(path):
+            return
+        with open(path) as f:
+            self.commands.update(json.load(f).get(hostname, {}))
+
+    def save(self, path, hostname):
+        """Store the estimates of hostname in path, keeping those of other hosts.
+
+        The file holds {hostname: {command key: estimate}} and is replaced
+        atomically, so drivers sharing a path do not overwrite each other.
+        """
+        with _save_lock:
+            profiles = {}
+            if os.path.exists(path):
+                with open(path) as f:
+                    profiles = json.load(f)
+            profiles[hostname] = self.commands
+            fd, tmp = tempfile.mkstemp(
+                dir=os.path.dirname(os.path.abspath(path)), prefix=os.path.basename(path)
+            )
+            try:
+                with os.fdopen(fd, "w") as f:
+                    json.dump(profiles, f, indent=1, sort_keys=True)
+                os.replace(tmp, path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
@@ -0,0 +1,237 @@
+"""Compact MAC address tables and a fleet wide MAC locator."""
+from array import array
+
+
+def mac_to_int(mac):
+    """Convert "00:11:22:33:44:55" (or - / . separated) to a 48 bit int."""
+    return int(mac.replace(":", "").replace("-", "").replace(".", ""), 16)
+
+
+def int_to_mac(value):
+    """Convert a 48 bit int to "00:11:22:33:44:55"."""
+    text = "%012X" % value
+    return ":".join(text[i:i + 2] for i in range(0, 12, 2))
+
+
+class MacIndex(object):
+    """Open addressing hash index from MACs to int values, kept in an array.
+
+    Values are non-negative ints, mac_of(value) returns the MAC a value
+    belongs to, so no key objects need to be stored. A MAC may have several
+    values.
+    """
+
+    __slots__ = ("_mac_of", "_slots", "_bits", "_len")
+
+    def __init__(self, mac_of):
+        self._mac_of = mac_of
+        self._bits = 4
+        self._slots = array("q", [-1]) * (1 << self._bits)
+        self._len = 0
+
+    def __len__(self):
+        return self._len
+
+    def _first(self, mac):
+        # Fibonacci hashing of the 48 bit MAC onto the table size
+        return ((mac * 0x9E3779B97F4A7C15) & 0xFFFFFFFFFFFFFFFF) >> (64 - self._bits)
+
+    def add(self, mac, value):
+        if (self._len + 1) * 2 > len(self._slots):
+            self._grow()
+        mask = len(self._slots) - 1
+        slot = self._first(mac)
+        while self._slots[slot] != -1:
+            slot = (slot + 1) & mask
+        self._slots[slot] = value
+        self._len += 1
+
+    def _grow(self):
+        values = [value for value in self._slots if value != -1]
+        self._bits += 1
+        self._slots = array("q", [-1]) * (1 << self._bits)
+        self._len = 0
+        for value in values:
+            self.add(self._mac_of(value), value)
+
+    def slots(self, mac):
+        """Yield the slots holding values of a MAC."""
+        mask = len(self._slots) - 1
+        slot = self._first(mac)
+        while True:
+            value = self._slots[slot]
+            if value == -1:
+                return
+            if self._mac_of(value) == mac:
+                yield slot
+            slot = (slot + 1) & mask
+
+    def get(self, mac):
+        """Return the values of a MAC."""
+        return [self._slots[slot] for slot in self.slots(mac)]
+
+    def __getitem__(self, slot):
+        return self._slots[slot]
+
+    def __setitem__(self, slot, value):
+        self._slots[slot] = value
+
+
+class CompactMacTable(object):
+    """MAC address table of one switch stored in parallel arrays.
+
+    MACs are 48 bit ints, interface names are interned and stored as an
+    index into self.interfaces. Rows are indexed by MAC (a MacIndex), by
+    interface and by VLAN.
+    """
+
+    def __init__(self, hostname=""):
+        self.hostname = hostname
+        self.macs = array("Q")
+        self.vlans = array("H")
+        self.ports = array("I")
+        self.static = bytearray()
+        self.interfaces = []
+        self._interface_index = {}
+        self._by_mac = MacIndex(self.macs.__getitem__)
+        self._by_port = []
+        self._by_vlan = {}
+
+    @classmethod
+    def from_entries(cls, entries, hostname=""):
+        """Build a table from get_mac_address_table style dicts."""
+        table = cls(hostname)
+        for entry in entries:
+            table.add(entry["mac"], entry["interface"], entry["vlan"], entry["static"])
+        return table
+
+    def __len__(self):
+        return len(self.macs)
+
+    def add(self, mac, interface, vlan, static=False):
+        row = len(self.macs)
+        if isinstance(mac, str):
+            mac = mac_to_int(mac)
+        port = self._interface_index.get(interface)
+        if port is None:
+            port = self._interface_index[interface] = len(self.interfaces)
+            self.interfaces.append(interface)
+            self._by_port.append(array("I"))
+        self.macs.append(mac)
+        self.vlans.append(vlan)
+        self.ports.append(port)
+        self.static.append(1 if static else 0)
+        self._by_mac.add(mac, row)
+        self._by_port[port].append(row)
+        rows = self._by_vlan.get(vlan)
+        if rows is None:
+            rows = self._by_vlan[vlan] = array("I")
+        rows.append(row)
+
+    def rows(self, mac):
+        """Return the row numbers of a MAC."""
+        if isinstance(mac, str):
+            mac = mac_to_int(mac)
+        return self._by_mac.get(mac)
+
+    def lookup(self, mac):
+        """Return (interface, vlan) pairs where a MAC was learned."""
+        return [(self.interfaces[self.ports[row]], self.vlans[row]) for row in self.rows(mac)]
+
+    def port_count(self, interface):
+        """Return the number of MACs learned on an interface."""
+        port = self._interface_index.get(interface)
+        return 0 if port is None else len(self._by_port[port])
+
+    def port_macs(self, interface):
+        """Return the MACs learned on an interface as ints."""
+        port = self._interface_index.get(interface)
+        if port is None:
+            return []
+        return [self.macs[row] for row in self._by_port[port]]
+
+    def vlan_macs(self, vlan):
+        """Return the MACs learned in a VLAN as ints."""
+        return [self.macs[row] for row in self._by_vlan.get(vlan, ())]
+
+    def entries(self):
+        """Yield the rows as get_mac_address_table style dicts."""
+        for row in range(len(self.macs)):
+            yield {
+                "mac": int_to_mac(self.macs[row]),
+                "interface": self.interfaces[self.ports[row]],
+                "vlan": self.vlans[row],
+                "active": True,
+                "static": bool(self.static[row]),
+                "moves": -1,
+                "last_move": -1.0
+            }
+
+
+class MacLocator(object):
+    """Merge the CompactMacTable of many switches to locate MACs.
+
+    Uplinks carry the MACs of everything behind them, so the sighting on
+    the interface with the fewest MACs is taken as the edge port of a MAC.
+    An interface is an uplink if it has more than uplink_threshold MACs or
+    carries a MAC that was seen on an interface with fewer MACs elsewhere.
+    """
+
+    def __init__(self, uplink_threshold=8):
+        self.uplink_threshold = uplink_threshold
+        self.tables = []
+        # table number << 32 | row of the edge sighting of every MAC
+        self._edge = MacIndex(self._mac_of)
+        self._transit = set()
+
+    def _mac_of(self, value):
+        return self.tables[value >> 32].macs[value & 0xFFFFFFFF]
+
+    def add(self, table):
+        number = len(self.tables)
+        self.tables.append(table)
+        counts = [len(rows) for rows in table._by_port]
+        for row in range(len(table.macs)):
+            mac = table.macs[row]
+            count = counts[table.ports[row]]
+            slot = next(self._edge.slots(mac), None)
+            if slot is None:
+                self._edge.add(mac, number << 32 | row)
+                continue
+            current = self._edge[slot]
+            other = self.tables[current >> 32]
+            other_row = current & 0xFFFFFFFF
+            other_count = other.port_count(other.interfaces[other.ports[other_row]])
+            if count < other_count:
+                self._edge[slot] = number << 32 | row
+                self._transit.add((other.hostname, other.interfaces[other.ports[other_row]]))
+            elif count > other_count:
+                self._transit.add((table.hostname, table.interfaces[table.ports[row]]))
+
+    def locate(self, mac):
+        """Return (hostname, interface, vlan) of the edge port of a MAC or None."""
+        if isinstance(mac, str):
+            mac = mac_to_int(mac)
+        slot = next(self._edge.slots(mac), None)
+        if slot is None:
+            return None
+        current = self._edge[slot]
+        table = self.tables[current >> 32]
+        row = current & 0xFFFFFFFF
+        return (table.hostname, table.interfaces[table.ports[row]], table.vlans[row])
+
+    def sightings(self, mac):
+        """Return (hostname, interface, vlan) of every switch that learned a MAC."""
+        res = []
+        for table in self.tables:
+            for interface, vlan in table.lookup(mac):
+                res.append((table.hostname, interface, vlan))
+        return res
+
+    def is_uplink(self, hostname, interface):
+        if (hostname, interface) in self._transit:
+            return True
+        for table in self.tables:
+            if table.hostname == hostname:
+                return table.port_count(interface) > self.uplink_threshold
+        return False
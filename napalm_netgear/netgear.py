@@ -1,9 +1,12 @@
 """NAPALM Netgear ProSafe Handler."""
 import re
 import socket
+import time
 
 from napalm.base.base import NetworkDriver
 from napalm.base.exceptions import (
+    CommandTimeoutException,
+    CommitError,
     ConnectionClosedException
 )
 from napalm.base.helpers import (
@@ -11,52 +14,52 @@ from napalm.base.helpers import (
 )
 from napalm.base.netmiko_helpers import netmiko_args
 
-from .parser import parseFixedLenght, parseList
-
-MAP_INTERFACE_SPEED = {
-    "10G Full": 10*1000,
-    "1000 Full": 1000,
-    "100 Full": 100,
-    "100 Half": 100,
-    "10 Full": 10,
-    "10 Half": 10,
-}
-
-MAP_SUBNETMASK_PREFIXLENGTH = {
-    "0.0.0.0":	        0,
-    "128.0.0.0":	    1,
-    "192.0.0.0":	    2,
-    "224.0.0.0":	    3,
-    "240.0.0.0":	    4,
-    "248.0.0.0":	    5,
-    "252.0.0.0":	    6,
-    "254.0.0.0":	    7,
-    "255.0.0.0":	    8,
-    "255.128.0.0":	    9,
-    "255.192.0.0":      10,
-    "255.224.0.0":	    11,
-    "255.240.0.0":	    12,
-    "255.248.0.0":	    13,
-    "255.252.0.0":	    14,
-    "255.254.0.0":	    15,
-    "255.255.0.0":	    16,
-    "255.255.128.0":	17,
-    "255.255.192.0":	18,
-    "255.255.224.0":	19,
-    "255.255.240.0":	20,
-    "255.255.248.0":	21,
-    "255.255.252.0":	22,
-    "255.255.254.0":	23,
-    "255.255.255.0":	24,
-    "255.255.255.128":	25,
-    "255.255.255.192":	26,
-    "255.255.255.224":	27,
-    "255.255.255.240":	28,
-    "255.255.255.248":	29,
-    "255.255.255.252":	30,
-    "255.255.255.254":	31,
-    "255.255.255.255":	32
-}
+from .archive import writeConfig
+from .cache import CommandCache
+from .channels import ChannelGroup
+from .config import compareConfig, configCommands, configDiff, parseConfig
+from .delta import DeltaTracker
+from .getters import (
+    GETTER_COMMANDS,
+    INTERFACE_COMMAND,
+    MAP_INTERFACE_SPEED,  # noqa
+    MAP_SUBNETMASK_PREFIXLENGTH,  # noqa
+    STATUS_COMMAND,
+    counterCommands,
+    interfaceMatcher,
+    isPattern,
+    iterMacAddressTable,
+    parseFacts,
+    parseGetter,
+    parseInterfaceCounters,
+    parseInterfaceNames,
+    parseInterfaces,
+    parseInterfacesIp,
+)
+from .instrumentation import CommandStats
+from .latency import LatencyProfile
+from .mactable import CompactMacTable
+from .parser import iterFixedLenght
+
+# The output of get_config should be directly usable by load_replace_candidate()
+# IOS adds some extra, unneeded lines that should be filtered.
+CONFIG_FILTER_STRINGS = [
+    r"^!System Up Time .*$",
+    r"^!Current SNTP Synchronized Time:.*$",
+]
+# generate_regex_or() adds an empty alternative matching every line
+CONFIG_FILTER_PATTERN = re.compile("|".join(CONFIG_FILTER_STRINGS))
+
+# markers of a rejected config line in the echo of the device
+CONFIG_ERROR_PATTERN = re.compile(r"^\s*(% (Invalid|Incomplete|Ambiguous)|Error:|ERROR).*$", re.M)
+
+# a prompt at the start of a line, with the mode if any, like "(M4250) (Interface 0/1)#",
+# whatever the hostname as a pushed "hostname" line changes it
+CONFIG_PROMPT_PATTERN = re.compile(r"^\([^)\n]*\) ?(?:\([^)\n]*\) ?)?[#>]", re.M)
+
+# a prompt outside of config mode, like "(M4250) #"
+EXEC_PROMPT_PATTERN = re.compile(r"^\([^)\n]*\) ?[#>]$")
+
 
 class NetgearDriver(NetworkDriver):
     """NAPALM Netgear ProSafe Handler."""
@@ -66,6 +69,7 @@ class NetgearDriver(NetworkDriver):
         if optional_args is None:
             optional_args = {}
         self.config = ""
+        self.replace = False
         self.hostname = hostname
         self.username = username
         self.password = password
@@ -73,9 +77,68 @@ class NetgearDriver(NetworkDriver):
 
         self.transport = optional_args.get("transport", "ssh")
 
+        # "full" sends the whole candidate on commit, "delta" only the lines
+        # that differ from the running config
+        self.commit_mode = optional_args.get("commit_mode", "full")
+        # lines per channel write on commit, 0 sends them with send_config_set
+        self.commit_batch_size = optional_args.get("commit_batch_size", 0)
+
+        # send independent show commands in one channel write instead of
+        # waiting for the prompt after each of them
+        self.bulk_commands = optional_args.get("bulk_commands", True)
+        self.bulk_batch_size = optional_args.get("bulk_batch_size", 16)
+        # shell channels opened over the SSH transport of the session to run
+        # independent show commands in parallel, 1 keeps the netmiko channel
+        self.ssh_channels = max(1, optional_args.get("ssh_channels", 1))
+        self._channels = None
+
+        # optional cache of show command output, disabled with a ttl of 0
+        self.cache = None
+        cache_ttl = optional_args.get("cache_ttl", 0)
+        if cache_ttl:
+            self.cache = CommandCache(
+                ttl=cache_ttl, size=optional_args.get("cache_size", 128)
+            )
+
+        # learn the prompt once in open() and pass it as expect_string, which
+        # spares netmiko a prompt lookup on every command
+        self.pin_prompt = optional_args.get("pin_prompt", True)
+        self.read_timeout = optional_args.get("read_timeout")
+
+        # per-command timing, see stats.snapshot() and stats.prometheus()
+        self.instrumentation_callback = optional_args.get("instrumentation_callback")
+        self.stats = CommandStats(hostname, callback=self._record_event)
+
+        # read timeouts learned from the timing of every command, optionally
+        # kept in a JSON file between sessions
+        self.latency = None
+        self.latency_profile = optional_args.get("latency_profile")
+        if optional_args.get("adaptive_timeouts", False) or self.latency_profile:
+            self.latency = LatencyProfile()
+            if self.latency_profile:
+                self.latency.load(self.latency_profile, hostname)
+
+        # "snmp" fills get_interfaces and get_interfaces_counters from IF-MIB
+        self.getter_backend = optional_args.get("getter_backend", "cli")
+        self.snmp = None
+        if self.getter_backend == "snmp":
+            from .snmp import SnmpClient
+            self.snmp = SnmpClient(
+                optional_args.get("snmp_host", hostname),
+                community=optional_args.get("snmp_community", "public"),
+                port=optional_args.get("snmp_port", 161),
+                timeout=optional_args.get("snmp_timeout", 2),
+                retries=optional_args.get("snmp_retries", 1),
+                max_repetitions=optional_args.get("snmp_max_repetitions", 25),
+            )
+
+        # previous results of the *_delta getters
+        self._deltas = {}
+
         self.netmiko_optional_args = netmiko_args(optional_args)
 
         self.device = None
+        self.prompt = None
 
         self.platform = "netgear_prosafe"
 
@@ -84,28 +147,319 @@ class NetgearDriver(NetworkDriver):
         self.device = self._netmiko_open(
             self.platform, netmiko_optional_args=self.netmiko_optional_args
         )
+        self.prompt = None
+        self._channels = None
+        if self.pin_prompt:
+            # netmiko has already disabled paging in its session preparation
+            self._find_prompt()
 
     def close(self):
         """Close the connection to the device and do the necessary cleanup."""
+        if self._channels:
+            self._channels.close()
+        self._channels = None
+        if self.latency is not None and self.latency_profile:
+            self.latency.save(self.latency_profile, self.hostname)
         self._netmiko_close()
+        self.prompt = None
+        self._invalidate_cache()
+
+    def _invalidate_cache(self):
+        if self.cache is not None:
+            self.cache.invalidate()
+
+    def cache_stats(self):
+        """Return hit/miss statistics of the command cache or None if it is disabled."""
+        if self.cache is None:
+            return None
+        return self.cache.stats()
 
     def _send_command(self, command):
         """Wrapper for self.device.send.command().
 
         If command is a list will iterate through commands until valid command.
+        Output is served from the command cache if enabled.
         """
+        if self.cache is None:
+            return self._send_command_uncached(command)
+        key = command if isinstance(command, str) else tuple(command)
+        output = self.cache.get(key)
+        if output is None:
+            output = self._send_command_uncached(command)
+            self.cache.set(key, output)
+        return output
+
+    def _send_command_uncached(self, command):
         try:
+            start = time.perf_counter()
             if isinstance(command, list):
-                for cmd in command:
-                    output = self.device.send_command(cmd)
+                for retries, cmd in enumerate(command):
+                    output = self._device_send_command(cmd)
                     if "% Invalid" not in output:
                         break
             else:
-                output = self.device.send_command(command)
+                retries = 0
+                cmd = command
+                output = self._device_send_command(command)
+            self.stats.record_command(cmd, time.perf_counter() - start, len(output), retries)
             return self._send_command_postprocess(output)
         except (socket.error, EOFError) as e:
             raise ConnectionClosedException(str(e))
 
+    def _send_commands(self, commands):
+        """Send a list of show commands and return their outputs in the same order.
+
+        In bulk mode the commands are written to the channel in batches of
+        bulk_batch_size and the combined reply is split at the prompt, so a
+        batch costs one round-trip instead of one per command. With
+        ssh_channels above 1 they are spread over that many shell channels.
+        """
+        channels = self._channel_group() if len(commands) > 1 else None
+        if not self.bulk_commands and channels is None:
+            return [self._send_command(cmd) for cmd in commands]
+        res = {}
+        if self.cache is not None:
+            for cmd in commands:
+                output = self.cache.get(cmd)
+                if output is not None:
+                    res[cmd] = output
+        missing = [cmd for cmd in commands if cmd not in res]
+        try:
+            if channels is not None and missing:
+                outputs = channels.send_commands(
+                    missing, callback=self._record_channel_command,
+                    timeout=lambda cmd: self._read_timeout([cmd])
+                )
+                for cmd, output in zip(missing, outputs):
+                    res[cmd] = self._send_command_postprocess(output)
+                    if self.cache is not None:
+                        self.cache.set(cmd, res[cmd])
+                missing = []
+            for i in range(0, len(missing), self.bulk_batch_size):
+                batch = missing[i:i + self.bulk_batch_size]
+                for cmd, output in zip(batch, self._send_batch(batch)):
+                    res[cmd] = output
+                    if self.cache is not None:
+                        self.cache.set(cmd, output)
+        except (socket.error, EOFError) as e:
+            if channels is not None:
+                channels.close()
+                self._channels = None
+            raise ConnectionClosedException(str(e))
+        return [res[cmd] for cmd in commands]
+
+    def _channel_group(self):
+        """Return the ChannelGroup of the session, None to use the netmiko channel."""
+        if self.ssh_channels < 2 or self._channels is False:
+            return None
+        if self._channels is None:
+            try:
+                self._channels = ChannelGroup(
+                    self.device.remote_conn.transport, self.ssh_channels,
+                    secret=getattr(self.device, "secret", ""), timeout=self.timeout
+                )
+            except Exception:
+                # telnet, or the device refused more channels
+                self._channels = False
+                return None
+        return self._channels
+
+    def _record_channel_command(self, command, seconds, output):
+        self.stats.record_command(command, seconds, len(output))
+
+    def _command_args(self, command):
+        """Return the keyword arguments for device.send_command()."""
+        args = {}
+        if self.pin_prompt:
+            args["expect_string"] = re.escape(self._find_prompt())
+        if self.read_timeout is not None:
+            args["read_timeout"] = self.read_timeout
+        return args
+
+    def _device_send_command(self, command):
+        """Run device.send_command().
+
+        With adaptive timeouts the command is read from the channel instead.
+        If no output arrived within its learned timeout, the read goes on with
+        a four times larger timeout, keeping the output received so far.
+        """
+        if self.latency is None:
+            return self.device.send_command(command, **self._command_args(command))
+        timeout = self._read_timeout([command])
+        self._find_prompt()
+        self.device.clear_buffer()
+        self.device.write_channel(command + self.device.RETURN)
+        output = self._read_until_prompt(
+            timeout=timeout, retry_timeout=min(self.latency.maximum, 4 * timeout)
+        )
+        # the output starts with the echo of the command
+        lines = output.split(self.prompt, 1)[0].split("\n", 1)
+        return lines[1] if len(lines) > 1 else ""
+
+    def _read_timeout(self, commands):
+        """Return the seconds to wait for more output of commands read from the channel.
+
+        With adaptive timeouts the learned timeouts of the commands are summed,
+        plus once the timeout for those not seen yet: read_timeout if it is
+        set, else the driver timeout.
+        """
+        if self.latency is None:
+            return self.timeout
+        timeouts = [self.latency.timeout(cmd) for cmd in commands]
+        timeout = sum(t for t in timeouts if t is not None)
+        if None in timeouts:
+            timeout += self.timeout if self.read_timeout is None else self.read_timeout
+        return timeout
+
+    def _record_event(self, event):
+        if self.latency is not None and event["type"] == "command":
+            self.latency.observe(event["command"], event["seconds"])
+        if self.instrumentation_callback is not None:
+            self.instrumentation_callback(event)
+
+    def _find_prompt(self):
+        """Return the prompt of the session, it is looked up only once."""
+        if self.prompt is None:
+            self.prompt = self.device.find_prompt()
+        return self.prompt
+
+    def _send_batch(self, commands):
+        """Write all commands at once and split the reply at prompt boundaries.
+
+        The time of a command is recorded from the prompt ending the previous
+        command, or the write for the first one, to its own prompt.
+        """
+        self._find_prompt()
+        self.device.clear_buffer()
+        start = time.perf_counter()
+        self.device.write_channel(
+            "".join(cmd + self.device.RETURN for cmd in commands)
+        )
+        prompts = []
+        output = self._read_until_prompt(
+            len(commands), timeout=self._read_timeout(commands), times=prompts
+        )
+        res = []
+        # every section starts with the echo of its command
+        sections = output.split(self.prompt)[:len(commands)]
+        for cmd, section, end in zip(commands, sections, prompts):
+            self.stats.record_command(cmd, end - start, len(section))
+            start = end
+            lines = section.split("\n", 1)
+            res.append(self._send_command_postprocess(lines[1] if len(lines) > 1 else ""))
+        return res
+
+    def _read_until_prompt(self, count=1, pattern=None, timeout=None, retry_timeout=None,
+                           times=None):
+        """Read from the channel until the prompt, or the regex pattern, was seen count times.
+
+        A pattern has to match within one line. Like _iter_command, times out
+        after timeout seconds, by default self.timeout, without new data. With
+        retry_timeout the first time out is not raised, the read goes on with
+        retry_timeout instead. Without a pattern, the time.perf_counter() at
+        which every prompt was read is appended to the list times.
+        """
+        if timeout is None:
+            timeout = self.timeout
+        chunks = []
+        seen = 0
+        # end of the data read so far that may hold the start of a prompt
+        tail = ""
+        # matches of pattern in the complete lines read so far
+        matched = 0
+        deadline = time.monotonic() + timeout
+        while seen < count:
+            data = self.device.read_channel()
+            if data:
+                deadline = time.monotonic() + timeout
+                chunks.append(data)
+                if pattern is None:
+                    window = tail + data
+                    found = window.count(self.prompt)
+                    if times is not None:
+                        times.extend([time.perf_counter()] * found)
+                    seen += found
+                    tail = window[max(0, len(window) - len(self.prompt) + 1):]
+                else:
+                    # only the last, incomplete line is searched again
+                    text = tail + data
+                    end = text.rfind("\n") + 1
+                    matched += len(pattern.findall(text, 0, end))
+                    tail = text[end:]
+                    seen = matched + len(pattern.findall(tail))
+                continue
+            if time.monotonic() > deadline:
+                if retry_timeout is None:
+                    raise CommandTimeoutException("Timed out waiting for prompt %s" % (
+                        self.prompt if pattern is None else pattern.pattern
+                    ))
+                timeout = retry_timeout
+                retry_timeout = None
+                deadline = time.monotonic() + timeout
+            time.sleep(0.01)
+        return "".join(chunks)
+
+    def _iter_command(self, command):
+        """Send a show command and yield its output line by line as it arrives.
+
+        Served from the command cache if enabled, output read this way is not
+        stored in the cache. If the caller stops early the remaining output is
+        discarded so the session stays usable.
+        """
+        if self.cache is not None:
+            output = self.cache.get(command)
+            if output is not None:
+                yield from output.splitlines()
+                return
+        prompt = self._find_prompt()
+        done = False
+        try:
+            self.device.clear_buffer()
+            start = time.perf_counter()
+            self.device.write_channel(command + self.device.RETURN)
+            received = 0
+            buffer = ""
+            echo = True
+            blank = 0
+            timeout = self._read_timeout([command])
+            deadline = time.monotonic() + timeout
+            while True:
+                data = self.device.read_channel()
+                if not data:
+                    if time.monotonic() > deadline:
+                        raise CommandTimeoutException(
+                            "Timed out waiting for prompt %s" % prompt
+                        )
+                    time.sleep(0.01)
+                    continue
+                deadline = time.monotonic() + timeout
+                received += len(data)
+                lines = (buffer + data).split("\n")
+                buffer = lines.pop()
+                for line in lines:
+                    if echo:
+                        # first line is the echo of the command
+                        echo = False
+                        continue
+                    # like the strip() of _send_command_postprocess, blank
+                    # lines are held back until it is known they are not trailing
+                    if line.strip() == "":
+                        blank += 1
+                        continue
+                    for _ in range(blank):
+                        yield ""
+                    blank = 0
+                    yield line
+                if buffer.startswith(prompt):
+                    done = True
+                    self.stats.record_command(command, time.perf_counter() - start, received)
+                    return
+        except (socket.error, EOFError) as e:
+            raise ConnectionClosedException(str(e))
+        finally:
+            if not done:
+                self.device.clear_buffer()
+
     @staticmethod
     def _send_command_postprocess(output):
         """
@@ -127,12 +481,15 @@ class NetgearDriver(NetworkDriver):
             # If unable to send, we can tell for sure that the connection is unusable
             return {"is_alive": False}
 
-    def get_interfaces(self):
+    def get_interfaces(self, interfaces=None):
         """
         Get interface details.
 
         last_flapped is not implemented
 
+        interfaces, a list of names or fnmatch patterns like "0/4*", limits the result to the
+        matching interfaces.
+
         Example Output:
 
         {   u'Vlan1': {   'description': u'N/A',
@@ -154,34 +511,39 @@ class NetgearDriver(NetworkDriver):
                         'mac_address': u'a493.4cc1.67a7',
                         'speed': 100}}
         """
-        # default values.
-        last_flapped = -1.0
+        match = interfaceMatcher(interfaces)
+        if self.snmp is not None:
+            return self._filter_interfaces(self.snmp.get_interfaces(), match)
 
-        command = "show interfaces status all"
-        output = self._send_command(command)
-        fields = parseFixedLenght(["name", "label", "state", "", "speed"], output.splitlines())
+        output = self._send_command(STATUS_COMMAND)
+        with self.stats.parse("get_interfaces"):
+            return parseInterfaces(output.splitlines(), match)
 
-        interface_dict = {}
-        for item in fields:
-            if(item["name"].startswith("lag")):
-                continue
-            try:
-                speed = MAP_INTERFACE_SPEED[item["speed"]]
-            except KeyError:
-                speed = 1000
-            interface_dict[item["name"]] = {
-                "is_enabled": True,
-                "is_up": (item["state"] == "Up"),
-                "description": item["label"],
-                "mac_address": "",
-                "last_flapped": last_flapped,
-                "mtu": 1500,
-                "speed": speed
-            }
+    @staticmethod
+    def _filter_interfaces(result, match):
+        if match is None:
+            return result
+        return dict((name, value) for name, value in result.items() if match(name))
+
+    def get_interfaces_delta(self):
+        """
+        Returns the changes of get_interfaces since the last call as a dictionary with the
+        keys added, removed and changed, each a dictionary of interfaces like get_interfaces.
+        The first call returns all interfaces as added.
+        """
+        tracker = self._delta_tracker("get_interfaces", lambda name, entry: name)
+        if self.snmp is not None:
+            return tracker.update(self.snmp.get_interfaces)
+
+        output = self._send_command(STATUS_COMMAND)
+
+        def parse():
+            with self.stats.parse("get_interfaces"):
+                return parseInterfaces(output.splitlines())
 
-        return interface_dict
+        return tracker.update(parse, raw=output)
 
-    def get_interfaces_counters(self):
+    def get_interfaces_counters(self, interfaces=None):
         """
         Return interface counters and errors.
 
@@ -198,33 +560,31 @@ class NetgearDriver(NetworkDriver):
         'tx_broadcast_packets': int,
         'rx_broadcast_packets': int,
 
-        Currently doesn't determine output broadcasts, multicasts
+        Currently doesn't determine output broadcasts, multicasts, octets with the CLI backend
+
+        interfaces, a list of names or fnmatch patterns like "0/4*", limits the result to the
+        matching interfaces. Only their counters are read, if interfaces holds names only the
+        interface status table is not read either.
         """
+        match = interfaceMatcher(interfaces)
+        if self.snmp is not None:
+            return self._filter_interfaces(self.snmp.get_interfaces_counters(), match)
+
         res = {}
-        command = "show interfaces status all"
-        output = self._send_command(command)
-        interfaces = parseFixedLenght(["name"], output.splitlines())
-        for a in interfaces:
-            name = a["name"]
-            if(name.startswith("lag")):
-                break
-            command = "show interface %s" % name
-            output = self._send_command(command)
-            stats = parseList(output.splitlines())
-            res[name] = {
-                'tx_errors': int(stats['Transmit Packet Errors']),
-                'rx_errors': int(stats['Packets Received With Error']),
-                'tx_discards': int(stats['Transmit Packets Discarded']),
-                'rx_discards': int(stats['Receive Packets Discarded']),
-                'tx_octets': -1,
-                'rx_octets': -1,
-                'tx_unicast_packets': int(stats['Packets Transmitted Without Errors']),
-                'rx_unicast_packets': int(stats['Packets Received Without Error']),
-                'tx_multicast_packets': -1,
-                'rx_multicast_packets': -1,
-                'tx_broadcast_packets': -1,
-                'rx_broadcast_packets': int(stats['Broadcast Packets Received']),
-            }
+        if match is not None and not any(isPattern(name) for name in interfaces):
+            # only names, the status table is not needed
+            names = [interfaces] if isinstance(interfaces, str) else list(interfaces)
+        else:
+            output = self._send_command(STATUS_COMMAND)
+            with self.stats.parse("get_interfaces_counters"):
+                names = parseInterfaceNames(output.splitlines(), match)
+        outputs = self._send_commands([INTERFACE_COMMAND % name for name in names])
+        with self.stats.parse("get_interfaces_counters"):
+            for name, output in zip(names, outputs):
+                if "% Invalid" in output:
+                    # unknown interface
+                    continue
+                res[name] = parseInterfaceCounters(output.splitlines())
         return res
 
     def get_mac_address_table(self):
@@ -239,21 +599,63 @@ class NetgearDriver(NetworkDriver):
             * moves (int)
             * last_move (float)
         """
-        res = []
         command = "show mac-addr-table"
         output = self._send_command(command)
-        fields = parseFixedLenght(["vlan", "mac", "interface", "", "status"], output.splitlines())
-        for item in fields:
-            res.append({
-                "mac": item["mac"],
-                "interface": item["interface"],
-                "vlan": int(item["vlan"]),
-                "active": True,
-                "static": (item["status"] == "Learned"),
-                "moves": -1,
-                "last_move": -1.0
-            })
-        return res
+        with self.stats.parse("get_mac_address_table"):
+            return list(iterMacAddressTable(output.splitlines()))
+
+    def iter_mac_address_table(self):
+        """
+        Same as get_mac_address_table but yields the entries while the device is
+        still sending the table, without holding the full output in memory.
+        """
+        return iterMacAddressTable(self._iter_command("show mac-addr-table"))
+
+    def get_mac_address_table_compact(self):
+        """
+        Returns the MAC address table as a mactable.CompactMacTable, built while the
+        table is read from the device without creating a dict per entry.
+        """
+        table = CompactMacTable(self.hostname)
+        fields = iterFixedLenght(
+            ["vlan", "mac", "interface", "", "status"],
+            self._iter_command("show mac-addr-table"), output="tuple"
+        )
+        for vlan, mac, interface, status in fields:
+            table.add(mac, interface, int(vlan), status == "Learned")
+        return table
+
+    def get_mac_address_table_delta(self, group="vlan"):
+        """
+        Returns the changes of get_mac_address_table since the last call as a dictionary with
+        the keys added, removed and changed, each a list of entries like get_mac_address_table.
+        Entries are identified by vlan and mac, an entry changes if it moves to another
+        interface. The first call returns all entries as added.
+
+        group ("vlan", "interface" or None) selects the digests kept of the previous table,
+        only VLANs or interfaces whose digest changed are compared entry by entry.
+        """
+        tracker = self._delta_tracker(
+            ("get_mac_address_table", group),
+            None if group is None else lambda key, entry: entry[group]
+        )
+        output = self._send_command("show mac-addr-table")
+
+        def parse():
+            with self.stats.parse("get_mac_address_table"):
+                return dict(
+                    ((entry["vlan"], entry["mac"]), entry)
+                    for entry in iterMacAddressTable(output.splitlines())
+                )
+
+        delta = tracker.update(parse, raw=output)
+        return dict((kind, list(entries.values())) for kind, entries in delta.items())
+
+    def _delta_tracker(self, key, group):
+        tracker = self._deltas.get(key)
+        if tracker is None:
+            tracker = self._deltas[key] = DeltaTracker(group)
+        return tracker
 
     def get_config(self, retrieve="all", full=False, sanitized=False):
         """Implementation of get_config for Netgear Prosafe.
@@ -264,13 +666,7 @@ class NetgearDriver(NetworkDriver):
         since IOS does not support candidate configuration.
         """
 
-        # The output of get_config should be directly usable by load_replace_candidate()
-        # IOS adds some extra, unneeded lines that should be filtered.
-        filter_strings = [
-            r"^!System Up Time .*$",
-            r"^!Current SNTP Synchronized Time:.*$",
-        ]
-        filter_pattern = generate_regex_or(filter_strings)
+        filter_pattern = generate_regex_or(CONFIG_FILTER_STRINGS)
 
         configs = {"startup": "", "running": "", "candidate": ""}
         # Netgear only supports "all" on "show run"
@@ -279,17 +675,49 @@ class NetgearDriver(NetworkDriver):
         if retrieve in ("startup", "all"):
             command = "show startup-config"
             output = self._send_command(command)
-            output = re.sub(filter_pattern, "", output, flags=re.M)
-            configs["startup"] = output.strip()
+            with self.stats.parse("get_config"):
+                output = re.sub(filter_pattern, "", output, flags=re.M)
+                configs["startup"] = output.strip()
 
         if retrieve in ("running", "all"):
             command = f"show running-config{run_full}"
             output = self._send_command(command)
-            output = re.sub(filter_pattern, "", output, flags=re.M)
-            configs["running"] = output.strip()
+            with self.stats.parse("get_config"):
+                output = re.sub(filter_pattern, "", output, flags=re.M)
+                configs["running"] = output.strip()
 
         return configs
 
+    def iter_config(self, retrieve="running", full=False):
+        """
+        Yields the lines of the startup or running config while the device is still sending
+        it, filtered like get_config. The lines of the filtered comments are dropped.
+        """
+        if retrieve == "startup":
+            command = "show startup-config"
+        elif retrieve == "running":
+            command = "show running-config all" if full else "show running-config"
+        else:
+            raise ValueError("retrieve must be startup or running, not %r" % retrieve)
+        started = False
+        for line in self._iter_command(command):
+            if CONFIG_FILTER_PATTERN.match(line):
+                continue
+            # like the strip() of get_config
+            if not started:
+                if line.strip() == "":
+                    continue
+                started = True
+            yield line
+
+    def dump_config(self, sink, retrieve="running", full=False, compression=None):
+        """
+        Writes the config to sink, a path or a file object, as it is read from the device and
+        returns the sha256 hex digest of the text. compression is "gzip", "zstd" or None, for
+        paths it defaults to the one of the extension (.gz, .zst).
+        """
+        return writeConfig(self.iter_config(retrieve, full), sink, compression)
+
     def load_replace_candidate(self, filename=None, config=None):
         """
         Populates the candidate configuration. You can populate it from a file or from a string.
@@ -306,6 +734,8 @@ class NetgearDriver(NetworkDriver):
             with open(filename, 'r') as f:
                 config = f.read()
         self.config = config
+        self.replace = True
+        self._invalidate_cache()
 
     def load_merge_candidate(self, filename=None, config=None):
         """
@@ -323,14 +753,26 @@ class NetgearDriver(NetworkDriver):
             with open(filename, 'r') as f:
                 config = f.read()
         self.config = config
+        self.replace = False
+        self._invalidate_cache()
 
     def compare_config(self):
         """
         :return: A string showing the difference between the running configuration and the \
         candidate configuration. The running_config is loaded automatically just before doing the \
         comparison so there is no need for you to do it.
+
+        Lines only in the candidate are prefixed with "+", lines only in the running config with
+        "-". Removals are only shown for a replace candidate.
         """
-        return "some stuff might be different"
+        return configDiff(self._config_changes())
+
+    def _config_changes(self):
+        """Compare the candidate with the running config, see config.compareConfig()."""
+        running = self.get_config(retrieve="running")["running"]
+        return compareConfig(
+            parseConfig(running), parseConfig(self.config or ""), replace=self.replace
+        )
 
     def commit_config(self, message="", revert_in=None):
         """
@@ -344,12 +786,73 @@ class NetgearDriver(NetworkDriver):
         :param revert_in: Optional - number of seconds before the configuration will be reverted
         :type revert_in: int|None
         """
+        self._invalidate_cache()
+        if self.commit_mode == "delta":
+            commands = configCommands(self._config_changes())
+            if not commands:
+                return
+        else:
+            commands = self.config.splitlines()
         output = ""
-        output = self.device.send_config_set(
-            config_commands=self.config.splitlines(),
-            enter_config_mode=False
-        )
-        output += self.device.save_config(confirm=True, confirm_response="")
+        try:
+            if self.commit_batch_size:
+                output = self._push_config(commands)
+            else:
+                output = self.device.send_config_set(
+                    config_commands=commands,
+                    enter_config_mode=False
+                )
+            output += self.device.save_config(confirm=True, confirm_response="")
+        finally:
+            # the running config read for the delta is outdated now, and the
+            # hostname and with it the prompt may have changed
+            self._invalidate_cache()
+            self.prompt = None
+
+    def _push_config(self, commands):
+        """Send config lines in chunks of commit_batch_size lines per channel write.
+
+        The echo of a chunk is read once and scanned for error markers. All
+        lines of a chunk reach the device before its echo is checked, lines of
+        later chunks are not sent after an error.
+        Config mode is left again if a line is rejected or not answered.
+        :raise CommitError: If the device rejected a line.
+        """
+        pattern = CONFIG_PROMPT_PATTERN
+        output = ""
+        try:
+            for i in range(0, len(commands), self.commit_batch_size):
+                chunk = commands[i:i + self.commit_batch_size]
+                self.device.clear_buffer()
+                self.device.write_channel(
+                    "".join(line + self.device.RETURN for line in chunk)
+                )
+                try:
+                    echo = self._read_until_prompt(len(chunk), pattern)
+                except CommandTimeoutException:
+                    self._exit_config_mode()
+                    raise
+                output += echo
+                if CONFIG_ERROR_PATTERN.search(echo) is None:
+                    continue
+                # every section starts with the echo of its line
+                for n, section in enumerate(pattern.split(echo)[:len(chunk)]):
+                    error = CONFIG_ERROR_PATTERN.search(section)
+                    if error is not None:
+                        self._exit_config_mode()
+                        raise CommitError(
+                            "line %d %r: %s" % (i + n + 1, chunk[n], error.group(0).strip())
+                        )
+        except (socket.error, EOFError) as e:
+            raise ConnectionClosedException(str(e))
+        return output
+
+    def _exit_config_mode(self):
+        """Leave config mode after a failed push, however deeply nested."""
+        for _ in range(5):
+            if EXEC_PROMPT_PATTERN.match(self.device.find_prompt()):
+                return
+            self.device.write_channel("exit" + self.device.RETURN)
 
     def get_facts(self):
         """
@@ -375,21 +878,10 @@ class NetgearDriver(NetworkDriver):
             }
         """
 
-        command = "show ver"
-        output = self._send_command(command)
-        fields = parseList(output.splitlines())
-
-        return {
-            'uptime': 0.0,
-            'vendor': 'Netgear',
-            'os_version': fields["Software Version"],
-            'serial_number': fields["Serial Number"],
-            'model': fields["Machine Model"],
-            'hostname': '',
-            'fqdn': '',
-            'interface_list': []
-        }
-    
+        outputs = self._send_commands(GETTER_COMMANDS["get_facts"])
+        with self.stats.parse("get_facts"):
+            return parseFacts(*outputs)
+
     def get_interfaces_ip(self):
         """
         Get interface ip details.
@@ -413,16 +905,44 @@ class NetgearDriver(NetworkDriver):
         """
         command = "show ip interface brief"
         output = self._send_command(command)
-        interface_list = parseFixedLenght(["Interface","State","IP Address","IP Mask","TYPE", "Method"], output.splitlines())
-        interfaces = {}
-        for a in interface_list:
-            if(a["Interface"]== ""):
-                break
-            if(a["Interface"] not in interfaces):
-                interfaces[a["Interface"]] = {
-                    "ipv4": {}
-                }
-            interfaces[a["Interface"]]["ipv4"][a["IP Address"]] = {
-                "prefix_length": MAP_SUBNETMASK_PREFIXLENGTH[a["IP Mask"]]
-            }
-        return interfaces
\ No newline at end of file
+        with self.stats.parse("get_interfaces_ip"):
+            return parseInterfacesIp(output.splitlines())
+
+    def get_snapshot(self, getters=None):
+        """
+        Returns a dictionary with the results of several getters, by default get_facts,
+        get_interfaces, get_interfaces_counters, get_interfaces_ip and get_mac_address_table.
+
+        The distinct commands of all getters are sent pipelined in one pass and every output is
+        parsed by the getters that need it. The per-port commands of get_interfaces_counters
+        depend on the interface table and are sent in a second pass.
+        """
+        if getters is None:
+            getters = list(GETTER_COMMANDS)
+        for getter in getters:
+            if getter not in GETTER_COMMANDS:
+                raise ValueError("get_snapshot does not support %r" % getter)
+        snmp = set()
+        if self.snmp is not None:
+            snmp = set(getters) & set(["get_interfaces", "get_interfaces_counters"])
+
+        commands = []
+        for getter in getters:
+            if getter in snmp:
+                continue
+            for command in GETTER_COMMANDS[getter]:
+                if command not in commands:
+                    commands.append(command)
+        outputs = dict(zip(commands, self._send_commands(commands)))
+        if "get_interfaces_counters" in getters and "get_interfaces_counters" not in snmp:
+            commands = counterCommands(outputs[STATUS_COMMAND])
+            outputs.update(zip(commands, self._send_commands(commands)))
+
+        res = {}
+        for getter in getters:
+            if getter in snmp:
+                res[getter] = getattr(self.snmp, getter)()
+                continue
+            with self.stats.parse(getter):
+                res[getter] = parseGetter(getter, outputs)
+        return res
@@ -0,0 +1,130 @@
+"""Parse captured CLI output into getter results without a device.
+
+A capture is either a session log, where every command follows a prompt
+like "(M4250-26G4XF-PoE+) #show ver" and its output runs until the next
+prompt, or a directory with one file per command named like the command
+with spaces replaced by "_" (e.g. show_mac-addr-table.txt). Only the
+napalm-free parser modules are imported, also in the worker processes.
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from .getters import GETTER_COMMANDS, STATUS_COMMAND, counterCommands, parseGetter
+
+# "(M4250-26G4XF-PoE+) #show ver", also in config modes like "(...) (Config)#"
+PROMPT_LINE_PATTERN = re.compile(r"^\([^)\n]*\) ?(?:\([^)\n]*\))?\s?[#>](.*)$")
+
+OfflineResult = namedtuple("OfflineResult", ["name", "results", "errors"])
+OfflineResult.__doc__ = """Getter results of one capture.
+
+name is the file name of the capture without extension, results maps
+getter names to their result and errors getter names to the exception.
+"""
+
+
+def splitSession(lines):
+    """Return {command: output} of a session log, later outputs of a command win."""
+    outputs = {}
+    command = None
+    output = []
+    for line in lines:
+        line = line.rstrip("\r\n")
+        match = PROMPT_LINE_PATTERN.match(line)
+        if match is None:
+            if command is not None:
+                output.append(line)
+            continue
+        if command:
+            outputs[command] = "\n".join(output).strip()
+        command = match.group(1).strip()
+        output = []
+    if command:
+        outputs[command] = "\n".join(output).strip()
+    return outputs
+
+
+def loadCapture(path):
+    """Return {command: output} of a session log file or a directory of outputs."""
+    if not os.path.isdir(path):
+        with open(path, errors="replace") as f:
+            return splitSession(f)
+    outputs = {}
+    for name in os.listdir(path):
+        if name.endswith(".txt"):
+            with open(os.path.join(path, name), errors="replace") as f:
+                outputs[name[:-4].replace("_", " ")] = f.read().strip()
+    return outputs
+
+
+def parseCapture(path, getters=None):
+    """Return the OfflineResult of a capture.
+
+    By default every getter whose commands were captured is run.
+    """
+    outputs = loadCapture(path)
+    if getters is None:
+        getters = [
+            getter for getter, commands in GETTER_COMMANDS.items()
+            if _captured(getter, commands, outputs)
+        ]
+    results = {}
+    errors = {}
+    for getter in getters:
+        try:
+            results[getter] = parseGetter(getter, outputs)
+        except Exception as e:
+            errors[getter] = e
+    name = os.path.splitext(os.path.basename(path.rstrip(os.sep)))[0]
+    return OfflineResult(name, results, errors)
+
+
+def _captured(getter, commands, outputs):
+    if not all(command in outputs for command in commands):
+        return False
+    if getter == "get_interfaces_counters":
+        return all(command in outputs for command in counterCommands(outputs[STATUS_COMMAND]))
+    return True
+
+
+def parseCaptures(paths, getters=None, processes=None, chunksize=4):
+    """Yield the OfflineResult of every capture, parsed by a pool of processes.
+
+    paths is a list of captures or a directory holding them. Results are
+    yielded in the order of paths.
+    """
+    if isinstance(paths, str):
+        paths = [os.path.join(paths, name) for name in sorted(os.listdir(paths))]
+    with ProcessPoolExecutor(max_workers=processes) as executor:
+        yield from executor.map(
+            parseCapture, paths, [getters] * len(paths), chunksize=chunksize
+        )
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="*", help="session logs or directories of outputs")
+    parser.add_argument("--dir", action="append", default=[],
+                        help="parse every capture in this directory, may be repeated")
+    parser.add_argument("--getter", action="append", dest="getters",
+                        help="getter to run, may be repeated, default all captured")
+    parser.add_argument("--processes", type=int, help="default the number of CPUs")
+    args = parser.parse_args(argv)
+    paths = list(args.paths)
+    for directory in args.dir:
+        paths.extend(os.path.join(directory, name) for name in sorted(os.listdir(directory)))
+    for res in parseCaptures(paths, args.getters, args.processes):
+        json.dump({
+            "name": res.name,
+            "results": res.results,
+            "errors": dict((getter, repr(e)) for getter, e in res.errors.items()),
+        }, sys.stdout)
+        sys.stdout.write("\n")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,36 +1,115 @@
 import re
+from functools import lru_cache
 
 
-def parseFixedLenght(fields, data):
-    cell_start = []
-    cell_end = []
-    res = []
-    for a in data:
+class FixedLenghtLayout(object):
+    """Column boundaries of a fixed length table.
+
+    The boundaries are taken from the dashed separator line below the
+    header. Row builders for a list of field names are created once and
+    reused for every row.
+    """
+
+    __slots__ = ("slices", "_builders")
+
+    def __init__(self, separator):
+        self.slices = tuple(
+            (m.start(), m.end()) for m in re.finditer(r"-[^ ]*", separator)
+        )
+        self._builders = {}
+
+    def builder(self, fields, output="dict"):
+        """Return a function converting a table line into a row.
+
+        output is one of "dict", "tuple" or "record". Empty field names
+        skip the column.
+        """
+        key = (tuple(fields), output)
+        if key in self._builders:
+            return self._builders[key]
+        columns = tuple(
+            (name, slice(start, end))
+            for name, (start, end) in zip(fields, self.slices)
+            if name != ""
+        )
+        if output == "dict":
+            def build(line):
+                return {name: line[cell].strip() for name, cell in columns}
+        elif output == "tuple":
+            cells = tuple(cell for _, cell in columns)
+
+            def build(line):
+                return tuple([line[cell].strip() for cell in cells])
+        elif output == "record":
+            cells = tuple(cell for _, cell in columns)
+            record = recordType(tuple(name for name, _ in columns))
+
+            def build(line):
+                return record(*[line[cell].strip() for cell in cells])
+        else:
+            raise ValueError("unknown output type %s" % output)
+        self._builders[key] = build
+        return build
+
+
+@lru_cache(maxsize=64)
+def compileLayout(separator):
+    """Return the cached FixedLenghtLayout for a separator line."""
+    return FixedLenghtLayout(separator)
+
+
+class FixedLenghtRecord(object):
+    """Base class of the records created by recordType."""
+
+    __slots__ = ()
+
+    def __init__(self, *values):
+        for name, value in zip(self.__slots__, values):
+            setattr(self, name, value)
+
+    def __eq__(self, other):
+        return type(self) is type(other) and tuple(self) == tuple(other)
+
+    def __iter__(self):
+        return (getattr(self, name) for name in self.__slots__)
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__, ", ".join(
+            "%s=%r" % (name, getattr(self, name)) for name in self.__slots__
+        ))
+
+
+@lru_cache(maxsize=64)
+def recordType(fields):
+    """Return a __slots__ record class for a tuple of field names.
+
+    Characters not allowed in attribute names are replaced by "_".
+    """
+    names = tuple(re.sub(r"\W", "_", name) for name in fields)
+    return type("Record", (FixedLenghtRecord,), {"__slots__": names})
+
+
+def iterFixedLenght(fields, data, output="dict"):
+    """Lazily parse a fixed length table.
+
+    Same as parseFixedLenght but yields the rows one by one as dicts,
+    tuples or records, see FixedLenghtLayout.builder.
+    """
+    lines = iter(data)
+    for a in lines:
         if(a.startswith("-")):
-            if(len(cell_start) > 0):
-                break
-            in_cell = False
-            for i in range(len(a)):
-                if(a[i] == "-" and in_cell is False):
-                    cell_start.append(i)
-                    in_cell = True
-                if(a[i] == " " and in_cell is True):
-                    cell_end.append(i)
-                    in_cell = False
-            if(in_cell):
-                cell_end.append(len(a))
-            continue
-
-        if(len(cell_start) == 0):
-            continue
-
-        item = {}
-        for i in range(len(fields)):
-            if(fields[i] == ""):
-                continue
-            item[fields[i]] = a[cell_start[i]:cell_end[i]].strip()
-        res.append(item)
-    return res
+            build = compileLayout(a).builder(fields, output)
+            break
+    else:
+        return
+    for a in lines:
+        if(a.startswith("-")):
+            break
+        yield build(a)
+
+
+def parseFixedLenght(fields, data):
+    return list(iterFixedLenght(fields, data))
 
 
 def parseList(data):
@@ -0,0 +1,183 @@
+"""Pool of open NetgearDriver sessions reused across collection cycles."""
+import threading
+import time
+from contextlib import contextmanager
+
+from napalm.base.exceptions import ConnectionException
+
+from .netgear import NetgearDriver
+
+
+class _Sessions(object):
+    """Pool state of one hostname."""
+
+    def __init__(self):
+        # (device, released) of the open sessions not in use, any credentials
+        self.idle = []
+        self.in_use = 0
+        self.failures = 0
+        self.next_attempt = 0.0
+
+
+class ConnectionPool(object):
+    """Keep driver sessions open between uses.
+
+    A session is handed out again only for the same hostname, username and
+    password. It is checked with is_alive before it is handed out and dead
+    ones are replaced. ProSafe firmware caps concurrent SSH sessions, so at
+    most max_sessions are open per hostname, whatever the credentials
+    (acquire waits up to wait_timeout for a free one, idle sessions of other
+    credentials are closed to make room), and at most max_idle are kept open
+    while unused, for idle_timeout seconds. After a failed open further
+    attempts to the hostname are refused for backoff seconds, doubling on
+    every failure up to max_backoff. Sessions are closed outside the lock
+    of the pool, so a slow disconnect does not hold up other hosts.
+    """
+
+    def __init__(self, max_sessions=2, max_idle=1, idle_timeout=300, wait_timeout=60,
+                 backoff=1, max_backoff=300, timeout=60, optional_args=None,
+                 driver=NetgearDriver):
+        self.max_sessions = max_sessions
+        self.max_idle = max_idle
+        self.idle_timeout = idle_timeout
+        self.wait_timeout = wait_timeout
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.optional_args = optional_args or {}
+        self.driver = driver
+        self._sessions = {}
+        self._lock = threading.Condition()
+
+    @contextmanager
+    def connection(self, hostname, username, password, timeout=None, optional_args=None):
+        """Context manager handing out an open driver.
+
+        The session is returned to the pool afterwards, or closed if the
+        block raised an exception.
+        """
+        device = self.acquire(hostname, username, password, timeout, optional_args)
+        try:
+            yield device
+        except Exception:
+            self.release(device, discard=True)
+            raise
+        self.release(device)
+
+    def acquire(self, hostname, username, password, timeout=None, optional_args=None):
+        deadline = time.monotonic() + self.wait_timeout
+        closing = []
+        try:
+            with self._lock:
+                sessions = self._sessions.setdefault(hostname, _Sessions())
+                while True:
+                    closing.extend(self._expire(sessions))
+                    device = self._take_idle(sessions, username, password)
+                    if device is not None:
+                        sessions.in_use += 1
+                        break
+                    if sessions.idle and sessions.in_use + len(sessions.idle) >= self.max_sessions:
+                        # the oldest idle session has other credentials
+                        closing.append(sessions.idle.pop(0)[0])
+                    if sessions.in_use + len(sessions.idle) < self.max_sessions:
+                        now = time.monotonic()
+                        if now < sessions.next_attempt:
+                            raise ConnectionException(
+                                "%s: backing off for %.1fs after %d failed connects" % (
+                                    hostname, sessions.next_attempt - now, sessions.failures
+                                )
+                            )
+                        sessions.in_use += 1
+                        break
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise ConnectionException(
+                            "%s: no free session within %ss" % (hostname, self.wait_timeout)
+                        )
+                    self._lock.wait(remaining)
+        finally:
+            for old in closing:
+                self._close(old)
+
+        if device is not None:
+            if device.is_alive()["is_alive"]:
+                return device
+            self._close(device)
+        return self._open(hostname, username, password, sessions, timeout, optional_args)
+
+    @staticmethod
+    def _take_idle(sessions, username, password):
+        """Return the newest idle session with the credentials or None, called locked."""
+        for i in range(len(sessions.idle) - 1, -1, -1):
+            device = sessions.idle[i][0]
+            if (device.username, device.password) == (username, password):
+                del sessions.idle[i]
+                return device
+        return None
+
+    def _open(self, hostname, username, password, sessions, timeout, optional_args):
+        args = dict(self.optional_args)
+        args.update(optional_args or {})
+        device = self.driver(
+            hostname, username, password,
+            timeout=self.timeout if timeout is None else timeout,
+            optional_args=args
+        )
+        try:
+            device.open()
+        except Exception:
+            with self._lock:
+                sessions.in_use -= 1
+                sessions.failures += 1
+                sessions.next_attempt = time.monotonic() + min(
+                    self.max_backoff, self.backoff * 2 ** (sessions.failures - 1)
+                )
+                self._lock.notify_all()
+            raise
+        with self._lock:
+            sessions.failures = 0
+            sessions.next_attempt = 0.0
+        return device
+
+    def release(self, device, discard=False):
+        """Return a session to the pool, discard closes it instead."""
+        device._invalidate_cache()
+        with self._lock:
+            sessions = self._sessions[device.hostname]
+            sessions.in_use -= 1
+            if not discard and len(sessions.idle) < self.max_idle:
+                sessions.idle.append((device, time.monotonic()))
+                device = None
+            self._lock.notify_all()
+        if device is not None:
+            self._close(device)
+
+    def _expire(self, sessions):
+        """Remove idle sessions older than idle_timeout and return them, called locked."""
+        now = time.monotonic()
+        keep = []
+        expired = []
+        for device, released in sessions.idle:
+            if now - released > self.idle_timeout:
+                expired.append(device)
+            else:
+                keep.append((device, released))
+        sessions.idle = keep
+        return expired
+
+    @staticmethod
+    def _close(device):
+        try:
+            device.close()
+        except Exception:
+            pass
+
+    def close(self):
+        """Close all idle sessions."""
+        closing = []
+        with self._lock:
+            for sessions in self._sessions.values():
+                closing.extend(device for device, _ in sessions.idle)
+                sessions.idle = []
+        for device in closing:
+            self._close(device)
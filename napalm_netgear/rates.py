@@ -0,0 +1,136 @@
+"""Per-second counter rates from repeated get_interfaces_counters polls."""
+import heapq
+import math
+import time
+from array import array
+
+# keys of get_interfaces_counters, in storage order
+COUNTERS = (
+    "tx_errors", "rx_errors", "tx_discards", "rx_discards",
+    "tx_octets", "rx_octets", "tx_unicast_packets", "rx_unicast_packets",
+    "tx_multicast_packets", "rx_multicast_packets", "tx_broadcast_packets",
+    "rx_broadcast_packets",
+)
+
+COUNTER_INDEX = dict((name, k) for k, name in enumerate(COUNTERS))
+
+NAN = float("nan")
+
+WRAP32 = 2 ** 32
+
+
+class CounterHistory(object):
+    """Fixed size history of counters and rates of the interfaces of one device.
+
+    Every interface gets two typed arrays of size * len(COUNTERS) entries,
+    one for the raw counters and one for the per-second rates, used as ring
+    buffers. The rates are computed when a sample is added. A counter that
+    went backwards is treated as a 32 bit wrap if the previous value was in
+    the upper quarter of the 32 bit range, otherwise as a reset (e.g. clear
+    counters), counting from zero. Counters reported as -1, and those of
+    interfaces missing in a sample, give NaN rates.
+    """
+
+    def __init__(self, size=60):
+        self.size = size
+        self.times = array("d", [NAN] * size)
+        self.pos = -1
+        self.count = 0
+        self.interfaces = []
+        self._slot = {}
+        self._values = []
+        self._rates = []
+        # latest rate per counter, indexed like self.interfaces
+        self._latest = [array("d") for _ in COUNTERS]
+
+    def _add_interface(self, name):
+        self._slot[name] = len(self.interfaces)
+        self.interfaces.append(name)
+        width = self.size * len(COUNTERS)
+        self._values.append(array("q", [-1]) * width)
+        self._rates.append(array("d", [NAN]) * width)
+        for latest in self._latest:
+            latest.append(NAN)
+        return self._slot[name]
+
+    def add(self, counters, timestamp=None):
+        """Store the result of one get_interfaces_counters call."""
+        if timestamp is None:
+            timestamp = time.time()
+        prev = self.pos
+        self.pos = (self.pos + 1) % self.size
+        elapsed = timestamp - self.times[prev] if self.count else NAN
+        self.times[self.pos] = timestamp
+        self.count = min(self.count + 1, self.size)
+        width = len(COUNTERS)
+        base = self.pos * width
+        prev_base = prev * width
+        for name in counters:
+            if name not in self._slot:
+                self._add_interface(name)
+        for slot, name in enumerate(self.interfaces):
+            sample = counters.get(name)
+            values = self._values[slot]
+            rates = self._rates[slot]
+            for k in range(width):
+                value = -1 if sample is None else sample[COUNTERS[k]]
+                old = values[prev_base + k] if prev >= 0 else -1
+                values[base + k] = value
+                if value < 0 or old < 0 or not elapsed > 0:
+                    rate = NAN
+                elif value >= old:
+                    rate = (value - old) / elapsed
+                elif old >= WRAP32 * 3 // 4 and old < WRAP32:
+                    rate = (value + WRAP32 - old) / elapsed
+                else:
+                    rate = value / elapsed
+                rates[base + k] = rate
+                self._latest[k][slot] = rate
+
+    def rate(self, interface, counter):
+        """Return the latest per-second rate of a counter, NaN if unknown."""
+        slot = self._slot.get(interface)
+        if slot is None or self.count == 0:
+            return NAN
+        return self._latest[COUNTER_INDEX[counter]][slot]
+
+    def rates(self, interface):
+        """Return the latest rates of an interface as a dict."""
+        return dict((counter, self.rate(interface, counter)) for counter in COUNTERS)
+
+    def history(self, interface, counter):
+        """Return (timestamp, value, rate) tuples of a counter, oldest first."""
+        slot = self._slot[interface]
+        k = COUNTER_INDEX[counter]
+        res = []
+        for i in range(self.count):
+            pos = (self.pos - self.count + 1 + i) % self.size
+            res.append((
+                self.times[pos],
+                self._values[slot][pos * len(COUNTERS) + k],
+                self._rates[slot][pos * len(COUNTERS) + k],
+            ))
+        return res
+
+    def top(self, counter="rx_octets", n=10):
+        """Return the n (interface, rate) pairs with the highest latest rate."""
+        latest = self._latest[COUNTER_INDEX[counter]]
+        slots = heapq.nlargest(
+            n, (slot for slot in range(len(latest)) if not math.isnan(latest[slot])),
+            key=latest.__getitem__
+        )
+        return [(self.interfaces[slot], latest[slot]) for slot in slots]
+
+
+class CounterPoller(object):
+    """Poll get_interfaces_counters of an open driver into a CounterHistory."""
+
+    def __init__(self, device, size=60):
+        self.device = device
+        self.history = CounterHistory(size)
+
+    def poll(self):
+        """Fetch the counters once and return the history."""
+        counters = self.device.get_interfaces_counters()
+        self.history.add(counters)
+        return self.history
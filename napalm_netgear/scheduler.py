@@ -0,0 +1,198 @@
+"""Run NetgearDriver getters periodically across many switches."""
+import heapq
+import random
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+from .fleet import FleetRunner
+from .netgear import NetgearDriver
+
+PollJob = namedtuple(
+    "PollJob", ["getter", "interval", "deadline", "priority", "kwargs"],
+    defaults=(None, 0, None)
+)
+PollJob.__doc__ = """A getter run every interval seconds on every host.
+
+A run not started deadline seconds after it was due is skipped, the
+default deadline is the interval. Among the runs due on a host the one
+with the highest priority goes first. kwargs are passed to the getter.
+"""
+
+PollResult = namedtuple(
+    "PollResult", ["hostname", "getter", "status", "result", "error", "due", "delay", "elapsed"]
+)
+PollResult.__doc__ = """Outcome of one run.
+
+status is "ok", "error", "skipped" (deadline expired before it started) or
+"coalesced" (it was still waiting when the next run of the job was due,
+which replaces it). delay is the time from due to start.
+"""
+
+
+class PollScheduler(object):
+    """Run PollJob on the hosts of an inventory and pass every PollResult to callback.
+
+    Inventory entries are dicts like for FleetRunner. The first run of every
+    job and host is spread randomly over the first interval and following
+    runs are shifted by up to jitter * interval, so the polls of a fleet do
+    not all start at once. A host is never polled by two sessions at once:
+    the runs due while it is busy wait and are then run in the same session,
+    by priority. At most max_workers hosts are polled at once. timeout is
+    the host timeout of FleetRunner.session(): a session running longer is
+    closed, the run it interrupted is reported as an error and the runs
+    still waiting get a new session.
+
+    callback is called from the worker threads and, for coalesced runs,
+    from the thread in run(), so it should return quickly.
+    """
+
+    def __init__(self, inventory, jobs, callback, max_workers=16, jitter=0.1, timeout=60,
+                 optional_args=None, driver=NetgearDriver, pool=None):
+        self.inventory = dict((host["hostname"], host) for host in inventory)
+        self.jobs = list(jobs)
+        self.callback = callback
+        self.max_workers = max_workers
+        self.jitter = jitter
+        self._runner = FleetRunner(
+            timeout=timeout, optional_args=optional_args, driver=driver, pool=pool
+        )
+        self._cond = threading.Condition()
+        self._stopped = False
+        # (due, sequence, hostname, job index)
+        self._heap = []
+        self._sequence = 0
+        # hostname -> {job index: due} of the runs waiting for the host
+        self._pending = {}
+        self._busy = set()
+
+    def run(self, duration=None):
+        """Schedule jobs until stop() is called or for duration seconds."""
+        start = time.monotonic()
+        end = None if duration is None else start + duration
+        with self._cond:
+            self._stopped = False
+            for hostname in self.inventory:
+                self._pending.setdefault(hostname, {})
+                for index, job in enumerate(self.jobs):
+                    self._push(start + random.uniform(0, job.interval), hostname, index)
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            with self._cond:
+                while not self._stopped:
+                    now = time.monotonic()
+                    if end is not None and now >= end:
+                        break
+                    while self._heap and self._heap[0][0] <= now:
+                        due, _, hostname, index = heapq.heappop(self._heap)
+                        job = self.jobs[index]
+                        spread = self.jitter * job.interval
+                        self._push(due + job.interval + random.uniform(-spread, spread),
+                                   hostname, index)
+                        self._queue(executor, hostname, index, due)
+                    wait = self._heap[0][0] - now if self._heap else None
+                    if end is not None:
+                        wait = end - now if wait is None else min(wait, end - now)
+                    self._cond.wait(wait)
+                self._stopped = True
+                self._heap = []
+        self._pending = {}
+
+    def stop(self):
+        with self._cond:
+            self._stopped = True
+            self._cond.notify_all()
+
+    def _push(self, due, hostname, index):
+        self._sequence += 1
+        heapq.heappush(self._heap, (due, self._sequence, hostname, index))
+
+    def _queue(self, executor, hostname, index, due):
+        pending = self._pending[hostname]
+        if index in pending:
+            self._report(hostname, index, "coalesced", due=pending[index])
+        pending[index] = due
+        if hostname not in self._busy:
+            self._busy.add(hostname)
+            executor.submit(self._run_host, hostname)
+
+    def _next(self, hostname):
+        """Return (job index, due) of the next run of a host or None, called locked."""
+        pending = self._pending.get(hostname)
+        if not pending or self._stopped:
+            return None
+        index = min(pending, key=lambda i: (-self.jobs[i].priority, pending[i]))
+        return index, pending.pop(index)
+
+    def _run_host(self, hostname):
+        host = self.inventory[hostname]
+        while True:
+            self._run_session(hostname, host)
+            with self._cond:
+                # runs may have become due while the session was closed, or
+                # be left over from a session whose host timeout expired
+                if not self._pending.get(hostname) or self._stopped:
+                    self._busy.discard(hostname)
+                    return
+
+    def _take(self, hostname):
+        """Return (job index, due, start) of the next run of a host to start or None.
+
+        Runs whose deadline expired are reported as skipped.
+        """
+        while True:
+            with self._cond:
+                run = self._next(hostname)
+            if run is None:
+                return None
+            index, due = run
+            job = self.jobs[index]
+            started = time.monotonic()
+            deadline = job.interval if job.deadline is None else job.deadline
+            if started - due <= deadline:
+                return index, due, started
+            self._report(hostname, index, "skipped", due=due, delay=started - due)
+
+    def _run_session(self, hostname, host):
+        """Run the waiting runs of a host in one session.
+
+        The session ends when no run is waiting or the host timeout of
+        FleetRunner expired, the remaining runs then get a new session.
+        """
+        run = self._take(hostname)
+        if run is None:
+            return
+        session = None
+        try:
+            with self._runner.session(host) as session:
+                while run is not None:
+                    index, due, started = run
+                    job = self.jobs[index]
+                    try:
+                        result = session.run(job.getter, **(job.kwargs or {}))
+                    except Exception as e:
+                        self._report(hostname, index, "error", error=e, due=due,
+                                     delay=started - due, elapsed=time.monotonic() - started)
+                    else:
+                        self._report(hostname, index, "ok", result=result, due=due,
+                                     delay=started - due, elapsed=time.monotonic() - started)
+                    if session.expired:
+                        return
+                    run = self._take(hostname)
+        except Exception as e:
+            if session is not None:
+                raise
+            index, due, started = run
+            self._report(hostname, index, "error", error=e, due=due, delay=started - due)
+            # the other waiting runs would fail the same way
+            with self._cond:
+                pending = self._pending[hostname]
+                self._pending[hostname] = {}
+            for index, due in pending.items():
+                self._report(hostname, index, "error", error=e, due=due, delay=started - due)
+
+    def _report(self, hostname, index, status, result=None, error=None, due=0.0, delay=0.0,
+                elapsed=0.0):
+        self.callback(PollResult(
+            hostname, self.jobs[index].getter, status, result, error, due, delay, elapsed
+        ))
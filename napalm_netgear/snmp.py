@@ -0,0 +1,215 @@
+"""SNMP backend for the interface getters, using GETBULK on IF-MIB."""
+import asyncio
+import re
+
+try:
+    from pysnmp.hlapi.v3arch.asyncio import (
+        CommunityData,
+        ContextData,
+        ObjectIdentity,
+        ObjectType,
+        SnmpEngine,
+        UdpTransportTarget,
+        bulk_cmd,
+    )
+    from pysnmp.proto.rfc1905 import EndOfMibView, NoSuchInstance, NoSuchObject
+except ImportError:
+    bulk_cmd = None
+
+SYS_UPTIME = "1.3.6.1.2.1.1.3"
+
+IF_TABLE = "1.3.6.1.2.1.2.2.1"
+IF_X_TABLE = "1.3.6.1.2.1.31.1.1.1"
+
+# column name -> OID
+COLUMNS = {
+    "ifDescr": IF_TABLE + ".2",
+    "ifMtu": IF_TABLE + ".4",
+    "ifPhysAddress": IF_TABLE + ".6",
+    "ifAdminStatus": IF_TABLE + ".7",
+    "ifOperStatus": IF_TABLE + ".8",
+    "ifLastChange": IF_TABLE + ".9",
+    "ifInDiscards": IF_TABLE + ".13",
+    "ifInErrors": IF_TABLE + ".14",
+    "ifOutDiscards": IF_TABLE + ".19",
+    "ifOutErrors": IF_TABLE + ".20",
+    "ifName": IF_X_TABLE + ".1",
+    "ifHCInOctets": IF_X_TABLE + ".6",
+    "ifHCInUcastPkts": IF_X_TABLE + ".7",
+    "ifHCInMulticastPkts": IF_X_TABLE + ".8",
+    "ifHCInBroadcastPkts": IF_X_TABLE + ".9",
+    "ifHCOutOctets": IF_X_TABLE + ".10",
+    "ifHCOutUcastPkts": IF_X_TABLE + ".11",
+    "ifHCOutMulticastPkts": IF_X_TABLE + ".12",
+    "ifHCOutBroadcastPkts": IF_X_TABLE + ".13",
+    "ifHighSpeed": IF_X_TABLE + ".15",
+    "ifAlias": IF_X_TABLE + ".18",
+}
+
+INTERFACE_COLUMNS = (
+    "ifDescr", "ifName", "ifAlias", "ifMtu", "ifPhysAddress", "ifAdminStatus",
+    "ifOperStatus", "ifLastChange", "ifHighSpeed",
+)
+
+COUNTER_COLUMNS = (
+    "ifDescr", "ifName", "ifInDiscards", "ifInErrors", "ifOutDiscards", "ifOutErrors",
+    "ifHCInOctets", "ifHCInUcastPkts", "ifHCInMulticastPkts", "ifHCInBroadcastPkts",
+    "ifHCOutOctets", "ifHCOutUcastPkts", "ifHCOutMulticastPkts", "ifHCOutBroadcastPkts",
+)
+
+# "Unit: 1 Slot: 0 Port: 1 Gigabit - Level"
+DESCR_PATTERN = re.compile(r"(?:Unit: (\d+) )?Slot: (\d+) Port: (\d+)")
+
+# "1/0/1", the CLI names of stackable switches
+STACK_NAME_PATTERN = re.compile(r"^\d+/\d+/\d+$")
+
+
+class SnmpError(Exception):
+    pass
+
+
+class SnmpClient(object):
+    """Walks IF-MIB columns of one switch with SNMPv2c GETBULK.
+
+    All requested columns are walked side by side, so a whole switch costs
+    about ports / max_repetitions round-trips. Interfaces are named like the
+    CLI getters: ifName, or else taken from ifDescr. That is "unit/slot/port"
+    on a stack, i.e. if ifDescr names a unit above 1 or another ifName has
+    that form, and "slot/port" otherwise.
+    """
+
+    def __init__(self, host, community="public", port=161, timeout=2, retries=1,
+                 max_repetitions=25):
+        if bulk_cmd is None:
+            raise ImportError(
+                "the SNMP backend requires pysnmp, install napalm_netgear[snmp]"
+            )
+        self.host = host
+        self.community = community
+        self.port = port
+        self.timeout = timeout
+        self.retries = retries
+        self.max_repetitions = max_repetitions
+
+    def walk(self, columns):
+        """Return sysUpTime and {column name: {ifIndex: value}} of the columns."""
+        return asyncio.run(self._walk(columns))
+
+    async def _walk(self, columns):
+        engine = SnmpEngine()
+        try:
+            target = await UdpTransportTarget.create(
+                (self.host, self.port), timeout=self.timeout, retries=self.retries
+            )
+            auth = CommunityData(self.community, mpModel=1)
+            res = {name: {} for name in columns}
+            # last OID returned per column that is not finished yet
+            active = dict((name, COLUMNS[name]) for name in columns)
+            uptime = None
+            while active:
+                names = list(active)
+                non_repeaters = 1 if uptime is None else 0
+                var_binds = [ObjectType(ObjectIdentity(active[name])) for name in names]
+                if uptime is None:
+                    var_binds.insert(0, ObjectType(ObjectIdentity(SYS_UPTIME)))
+                error, status, index, response = await bulk_cmd(
+                    engine, auth, target, ContextData(),
+                    non_repeaters, self.max_repetitions, *var_binds
+                )
+                if error:
+                    raise SnmpError("%s: %s" % (self.host, error))
+                if status:
+                    raise SnmpError("%s: %s at %s" % (self.host, status.prettyPrint(), index))
+                if uptime is None:
+                    uptime = int(response[0][1])
+                    response = response[1:]
+                done = set()
+                for i, (oid, value) in enumerate(response):
+                    name = names[i % len(names)]
+                    if name in done:
+                        continue
+                    oid = str(oid)
+                    prefix = COLUMNS[name] + "."
+                    if (not oid.startswith(prefix)
+                            or isinstance(value, (EndOfMibView, NoSuchInstance, NoSuchObject))):
+                        done.add(name)
+                        continue
+                    res[name][int(oid[len(prefix):])] = value
+                    active[name] = oid
+                for name in done:
+                    del active[name]
+                if not response:
+                    break
+            return uptime, res
+        finally:
+            engine.close_dispatcher()
+
+    @staticmethod
+    def _names(res):
+        """Return {ifIndex: name} of the walked interfaces, lags are skipped."""
+        descrs = dict(
+            (index, DESCR_PATTERN.search(str(descr))) for index, descr in res["ifDescr"].items()
+        )
+        stack = (
+            any(match and int(match.group(1) or 1) > 1 for match in descrs.values())
+            or any(STACK_NAME_PATTERN.match(str(name)) for name in res["ifName"].values())
+        )
+        names = {}
+        for index, descr in res["ifDescr"].items():
+            name = str(res["ifName"].get(index, ""))
+            if name == "":
+                match = descrs[index]
+                if match is None:
+                    name = str(descr)
+                elif stack:
+                    name = "%s/%s/%s" % (match.group(1) or 1, match.group(2), match.group(3))
+                else:
+                    name = "%s/%s" % match.group(2, 3)
+            if name.startswith("lag"):
+                continue
+            names[index] = name
+        return names
+
+    def get_interfaces(self):
+        """Return the result of NetgearDriver.get_interfaces."""
+        uptime, res = self.walk(INTERFACE_COLUMNS)
+        interfaces = {}
+        for index, name in self._names(res).items():
+            mac = bytes(res["ifPhysAddress"].get(index, b""))
+            last_change = int(res["ifLastChange"].get(index, 0))
+            interfaces[name] = {
+                "is_enabled": int(res["ifAdminStatus"].get(index, 2)) == 1,
+                "is_up": int(res["ifOperStatus"].get(index, 2)) == 1,
+                "description": str(res["ifAlias"].get(index, "")),
+                "mac_address": ":".join("%02X" % b for b in mac),
+                "last_flapped": (uptime - last_change) / 100.0 if last_change else -1.0,
+                "mtu": int(res["ifMtu"].get(index, 1500)),
+                "speed": int(res["ifHighSpeed"].get(index, 0)),
+            }
+        return interfaces
+
+    def get_interfaces_counters(self):
+        """Return the result of NetgearDriver.get_interfaces_counters."""
+        _, res = self.walk(COUNTER_COLUMNS)
+
+        def counter(column, index):
+            value = res[column].get(index)
+            return -1 if value is None else int(value)
+
+        counters = {}
+        for index, name in self._names(res).items():
+            counters[name] = {
+                "tx_errors": counter("ifOutErrors", index),
+                "rx_errors": counter("ifInErrors", index),
+                "tx_discards": counter("ifOutDiscards", index),
+                "rx_discards": counter("ifInDiscards", index),
+                "tx_octets": counter("ifHCOutOctets", index),
+                "rx_octets": counter("ifHCInOctets", index),
+                "tx_unicast_packets": counter("ifHCOutUcastPkts", index),
+                "rx_unicast_packets": counter("ifHCInUcastPkts", index),
+                "tx_multicast_packets": counter("ifHCOutMulticastPkts", index),
+                "rx_multicast_packets": counter("ifHCInMulticastPkts", index),
+                "tx_broadcast_packets": counter("ifHCOutBroadcastPkts", index),
+                "rx_broadcast_packets": counter("ifHCInBroadcastPkts", index),
+            }
+        return counters
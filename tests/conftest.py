@@ -0,0 +1,6 @@
+import os
+import sys
+
+# FakeDevice of the benchmarks stands in for the netmiko connection
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, os.path.join(ROOT, "benchmarks"))
@@ -0,0 +1,87 @@
+import time
+
+import pytest
+from fakedevice import INVALID, FakeDevice, load_fixtures
+from napalm.base.exceptions import CommandTimeoutException
+
+from napalm_netgear.netgear import NetgearDriver
+
+OUTPUTS = load_fixtures()
+
+
+class Silent(FakeDevice):
+    """Never answers."""
+
+    def read_channel(self):
+        return ""
+
+
+def driver(device=None, **optional_args):
+    res = NetgearDriver("fake", "admin", "admin", timeout=0.2, optional_args=optional_args)
+    res.device = FakeDevice() if device is None else device
+    return res
+
+
+@pytest.mark.parametrize("chunk_size", [1, 7, 20, 4096])
+def test_prompt_split_across_chunks(chunk_size):
+    device = driver(FakeDevice(chunk_size=chunk_size))
+    outputs = device._send_batch(["show ver", "show sysinfo"])
+    assert outputs == [OUTPUTS["show ver"].strip(), OUTPUTS["show sysinfo"].strip()]
+
+
+def test_sections_in_command_order():
+    commands = ["show sysinfo", "show ip interface brief", "show ver", "show mac-addr-table"]
+    outputs = driver(FakeDevice(chunk_size=13))._send_batch(commands)
+    assert outputs == [OUTPUTS[cmd].strip() for cmd in commands]
+
+
+def test_invalid_section_in_the_middle():
+    outputs = driver()._send_batch(["show ver", "show nonsense", "show sysinfo"])
+    assert outputs[0] == OUTPUTS["show ver"].strip()
+    assert outputs[1] == INVALID.strip()
+    assert outputs[2] == OUTPUTS["show sysinfo"].strip()
+
+
+def test_batch_timeout():
+    with pytest.raises(CommandTimeoutException):
+        driver(Silent())._send_batch(["show ver", "show sysinfo"])
+
+
+def test_send_commands_batches():
+    device = driver(FakeDevice(chunk_size=5), bulk_batch_size=2)
+    commands = ["show ver", "show sysinfo", "show ip interface brief"]
+    assert device._send_commands(commands) == [OUTPUTS[cmd].strip() for cmd in commands]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 9, 4096])
+def test_push_config_prompt_pattern_across_chunks(chunk_size):
+    device = driver(FakeDevice(chunk_size=chunk_size), commit_batch_size=3)
+    commands = ["configure", "interface 0/1", "description x", "exit", "exit"]
+    device._push_config(commands)
+    assert device.device.commands == commands
+
+
+class SlowSecond(FakeDevice):
+    """The output of the second command arrives delay seconds late."""
+
+    delay = 0.2
+
+    def read_channel(self):
+        first = self._buffer.find(self.prompt) + len(self.prompt)
+        if self._pos >= first and self.delay:
+            time.sleep(self.delay)
+            self.delay = 0
+        return super().read_channel()
+
+
+def test_batch_records_time_per_command():
+    events = []
+    device = driver(
+        SlowSecond(chunk_size=64), instrumentation_callback=events.append, adaptive_timeouts=True
+    )
+    device._send_batch(["show ver", "show mac-addr-table", "show sysinfo"])
+    seconds = dict((e["command"], e["seconds"]) for e in events if e["type"] == "command")
+    assert seconds["show ver"] < 0.1
+    assert seconds["show mac-addr-table"] >= 0.2
+    assert seconds["show sysinfo"] < 0.1
+    assert device.latency.commands["show mac-addr-table"]["mean"] >= 0.2
@@ -0,0 +1,17 @@
+from fakedevice import FakeDevice
+from napalm_netgear.netgear import NetgearDriver
+
+
+def driver(**optional_args):
+    device = NetgearDriver("fake", "admin", "admin", timeout=1, optional_args=optional_args)
+    device.device = FakeDevice()
+    return device
+
+
+def test_delta_commit_invalidates_cached_running_config():
+    device = driver(cache_ttl=60, commit_mode="delta")
+    device.load_merge_candidate(config='hostname "new"')
+    device.commit_config()
+    sent = len(device.device.commands)
+    device.get_config(retrieve="running")
+    assert device.device.commands[sent:] == ["show running-config"]
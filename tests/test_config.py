@@ -0,0 +1,179 @@
+from napalm_netgear.config import compareConfig, configCommands, configDiff, parseConfig
+
+RUNNING = """!Current Configuration:
+!
+hostname "sw1"
+snmp-server community "public"
+vlan database
+vlan 10,20
+exit
+configure
+interface 0/1
+description 'uplink'
+vlan participation include 10,20
+vlan tagging 10,20
+vlan pvid 20
+exit
+interface 0/2
+vlan participation include 10
+exit
+exit
+"""
+
+
+def commands(running, candidate, replace=True):
+    return configCommands(compareConfig(parseConfig(running), parseConfig(candidate), replace))
+
+
+def interface(*lines):
+    return "configure\ninterface 0/1\n%s\nexit\nexit\n" % "\n".join(lines)
+
+
+def test_parse_blocks_closed_by_exit():
+    root = parseConfig(RUNNING)
+    assert list(root.children) == [
+        'hostname "sw1"', 'snmp-server community "public"', "vlan database", "configure"
+    ]
+    configure = root.children["configure"]
+    assert list(configure.children) == ["interface 0/1", "interface 0/2"]
+    assert list(configure.children["interface 0/1"].children) == [
+        "description 'uplink'", "vlan participation include 10,20",
+        "vlan tagging 10,20", "vlan pvid 20",
+    ]
+
+
+def test_parse_indented_blocks():
+    root = parseConfig("interface 0/1\n  vlan pvid 10\nhostname \"sw1\"\n")
+    assert list(root.children) == ["interface 0/1", 'hostname "sw1"']
+    assert list(root.children["interface 0/1"].children) == ["vlan pvid 10"]
+
+
+def test_compare_replace_and_merge():
+    running = parseConfig(interface("vlan pvid 20", "description 'a'"))
+    candidate = parseConfig(interface("vlan pvid 10"))
+    changes = [
+        (path, sign, node.line) for path, sign, node in compareConfig(running, candidate)
+    ]
+    assert changes == [
+        (("configure", "interface 0/1"), "-", "vlan pvid 20"),
+        (("configure", "interface 0/1"), "-", "description 'a'"),
+        (("configure", "interface 0/1"), "+", "vlan pvid 10"),
+    ]
+    merged = compareConfig(running, candidate, replace=False)
+    assert [(sign, node.line) for _, sign, node in merged] == [("+", "vlan pvid 10")]
+
+
+def test_diff():
+    running = parseConfig(interface("vlan pvid 20"))
+    candidate = parseConfig(interface("vlan pvid 10"))
+    assert configDiff(compareConfig(running, candidate)) == (
+        "  configure\n"
+        "    interface 0/1\n"
+        "-     vlan pvid 20\n"
+        "+     vlan pvid 10"
+    )
+    assert configDiff(compareConfig(running, running)) == ""
+
+
+def test_commands_override_replaces_value():
+    assert commands(interface("vlan pvid 20"), interface("vlan pvid 10")) == [
+        "configure", "interface 0/1", "vlan pvid 10", "exit", "exit"
+    ]
+
+
+def test_commands_negate_removed_line():
+    assert commands(interface("vlan pvid 20", "description 'a'"), interface("vlan pvid 20")) == [
+        "configure", "interface 0/1", "no description", "exit", "exit"
+    ]
+
+
+def test_commands_negate_removed_no_line():
+    assert commands(interface("no auto-negotiate"), interface()) == [
+        "configure", "interface 0/1", "auto-negotiate", "exit", "exit"
+    ]
+
+
+def test_commands_additive_removes_dropped_members():
+    running = interface("vlan participation include 10,20", "vlan tagging 10,20")
+    candidate = interface("vlan participation include 10", "vlan tagging 10")
+    assert commands(running, candidate) == [
+        "configure", "interface 0/1",
+        "vlan participation include 10", "vlan tagging 10",
+        "no vlan tagging 20", "vlan participation auto 20",
+        "exit", "exit",
+    ]
+
+
+def test_commands_additive_ranges():
+    running = interface("vlan tagging 10-15,20")
+    candidate = interface("vlan tagging 12,20-21")
+    assert commands(running, candidate) == [
+        "configure", "interface 0/1", "vlan tagging 12,20-21", "no vlan tagging 10-11,13-15",
+        "exit", "exit",
+    ]
+
+
+def test_commands_additive_superset_removes_nothing():
+    running = interface("vlan tagging 10")
+    candidate = interface("vlan tagging 10,20")
+    assert commands(running, candidate) == [
+        "configure", "interface 0/1", "vlan tagging 10,20", "exit", "exit"
+    ]
+
+
+def test_commands_additive_without_added_line():
+    running = interface("vlan participation exclude 30", "vlan pvid 10")
+    assert commands(running, interface("vlan pvid 10")) == [
+        "configure", "interface 0/1", "vlan participation auto 30", "exit", "exit"
+    ]
+
+
+def test_commands_additive_unknown_members_removes_all():
+    running = interface("vlan tagging 10,20")
+    candidate = interface("vlan tagging all")
+    assert commands(running, candidate) == [
+        "configure", "interface 0/1", "no vlan tagging 10,20", "vlan tagging all",
+        "exit", "exit",
+    ]
+
+
+def test_commands_vlan_database_removes_dropped_vlans():
+    running = "vlan database\nvlan 10,20\nvlan name 20 \"voice\"\nexit\n"
+    candidate = "vlan database\nvlan 10\nexit\n"
+    assert commands(running, candidate) == [
+        "vlan database", "vlan 10", "no vlan name 20", "no vlan 20", "exit"
+    ]
+
+
+def test_commands_setting_replaced_without_removal():
+    running = (
+        'username "admin" password aaa level 15 encrypted\n'
+        "network parms 10.0.0.2 255.0.0.0\n"
+    )
+    candidate = running.replace("aaa", "bbb").replace("10.0.0.2", "10.0.0.3")
+    assert commands(running, candidate) == [
+        'username "admin" password bbb level 15 encrypted', "network parms 10.0.0.3 255.0.0.0"
+    ]
+
+
+def test_commands_removal_after_addition():
+    running = 'username "guest" password aaa level 1 encrypted\n'
+    candidate = 'username "ops" password bbb level 15 encrypted\n'
+    assert commands(running, candidate) == [
+        'username "ops" password bbb level 15 encrypted', 'no username "guest"'
+    ]
+
+
+def test_commands_removed_block():
+    running = RUNNING
+    candidate = RUNNING.replace("interface 0/2\nvlan participation include 10\nexit\n", "")
+    assert commands(running, candidate) == [
+        "configure", "interface 0/2", "vlan participation auto 10", "exit", "exit"
+    ]
+
+
+def test_commands_merge_keeps_running_lines():
+    candidate = interface("vlan tagging 30")
+    assert commands(RUNNING, candidate, replace=False) == [
+        "configure", "interface 0/1", "vlan tagging 30", "exit", "exit"
+    ]
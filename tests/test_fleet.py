@@ -0,0 +1,61 @@
+import threading
+import time
+
+from fakedevice import FakeDevice
+from napalm.base.exceptions import CommandTimeoutException
+
+from napalm_netgear.fleet import FleetRunner
+from napalm_netgear.netgear import NetgearDriver
+from napalm_netgear.scheduler import PollJob, PollScheduler
+
+
+class Trickle(FakeDevice):
+    """Sends output forever, never the prompt."""
+
+    def read_channel(self):
+        time.sleep(0.01)
+        return "x" if self.connected else ""
+
+
+class Driver(NetgearDriver):
+    def open(self):
+        self.device = Trickle() if self.hostname == "hung" else FakeDevice()
+        self._netmiko_device = self.device
+
+
+INVENTORY = [
+    {"hostname": "hung", "username": "admin", "password": "admin"},
+    {"hostname": "sw1", "username": "admin", "password": "admin"},
+]
+
+
+def test_run_host_timeout_interrupts_getter():
+    runner = FleetRunner(timeout=0.3, driver=Driver)
+    start = time.monotonic()
+    res = runner.run_host(INVENTORY[0], ["get_facts", "get_interfaces"])
+    assert time.monotonic() - start < 2
+    assert res.results == {}
+    assert all(isinstance(e, CommandTimeoutException) for e in res.errors.values())
+    assert sorted(res.errors) == ["get_facts", "get_interfaces"]
+
+
+def test_run():
+    results = dict((res.hostname, res) for res in FleetRunner(timeout=0.3, driver=Driver).run(
+        INVENTORY, ["get_facts"]
+    ))
+    assert list(results["sw1"].results) == ["get_facts"]
+    assert list(results["hung"].errors) == ["get_facts"]
+
+
+def test_scheduler_enforces_host_timeout():
+    results = []
+    scheduler = PollScheduler(
+        INVENTORY, [PollJob("get_facts", 0.5)], results.append, driver=Driver, timeout=0.2
+    )
+    threading.Timer(2, scheduler.stop).start()
+    scheduler.run()
+    hung = [res for res in results if res.hostname == "hung"]
+    assert len(hung) >= 2
+    assert all(res.status == "error" for res in hung)
+    assert all(isinstance(res.error, CommandTimeoutException) for res in hung)
+    assert all(res.status == "ok" for res in results if res.hostname == "sw1")
@@ -0,0 +1,60 @@
+import threading
+import time
+
+import pytest
+from fakedevice import FakeDevice
+from napalm.base.exceptions import ConnectionException
+
+from napalm_netgear.netgear import NetgearDriver
+from napalm_netgear.pool import ConnectionPool
+
+
+class Driver(NetgearDriver):
+    close_delay = 0.0
+
+    def open(self):
+        self.device = FakeDevice()
+        self._netmiko_device = self.device
+
+    def is_alive(self):
+        return {"is_alive": self.device is not None}
+
+    def close(self):
+        time.sleep(self.close_delay)
+        self.device = None
+
+
+def test_max_sessions_per_hostname_across_credentials():
+    pool = ConnectionPool(max_sessions=2, wait_timeout=0.1, driver=Driver)
+    pool.acquire("sw1", "admin", "a")
+    pool.acquire("sw1", "ops", "b")
+    with pytest.raises(ConnectionException):
+        pool.acquire("sw1", "monitor", "c")
+    pool.acquire("sw2", "monitor", "c")
+
+
+def test_idle_session_of_other_credentials_makes_room():
+    pool = ConnectionPool(max_sessions=1, driver=Driver)
+    first = pool.acquire("sw1", "admin", "a")
+    pool.release(first)
+    second = pool.acquire("sw1", "ops", "b")
+    assert second is not first
+    assert first.device is None
+    pool.release(second)
+    assert pool.acquire("sw1", "ops", "b") is second
+
+
+def test_slow_close_does_not_block_other_hosts():
+    pool = ConnectionPool(max_sessions=1, idle_timeout=0, driver=Driver)
+    slow = pool.acquire("slow", "admin", "a")
+    slow.close_delay = 1.0
+    pool.release(slow)
+    time.sleep(0.01)
+    # expires the idle session of "slow" and closes it
+    thread = threading.Thread(target=pool.acquire, args=("slow", "admin", "a"))
+    thread.start()
+    time.sleep(0.1)
+    start = time.monotonic()
+    pool.acquire("sw1", "admin", "a")
+    assert time.monotonic() - start < 0.5
+    thread.join()
@@ -0,0 +1,132 @@
+import pytest
+
+pytest.importorskip("pysnmp")
+
+from pysnmp.proto.rfc1902 import (  # noqa: E402
+    Counter64, Integer, ObjectName, OctetString, TimeTicks,
+)
+from pysnmp.proto.rfc1905 import EndOfMibView  # noqa: E402
+
+from napalm_netgear import snmp  # noqa: E402
+
+
+def _oid(oid):
+    return tuple(int(part) for part in oid.split("."))
+
+
+class FakeAgent(object):
+    """Answers GETBULK requests from a table of OID -> value like an agent would."""
+
+    def __init__(self, data):
+        self.data = data
+        self.oids = sorted(data, key=_oid)
+        self.requests = 0
+
+    def next(self, oid):
+        for key in self.oids:
+            if _oid(key) > _oid(oid):
+                return key
+        return None
+
+    async def bulk_cmd(self, engine, auth, target, context, non_repeaters, max_repetitions,
+                       *var_binds):
+        self.requests += 1
+        oids = [var_bind[0] for var_bind in var_binds]
+        response = []
+        for oid in oids[:non_repeaters]:
+            key = self.next(oid)
+            response.append((ObjectName(key), self.data[key]))
+        current = oids[non_repeaters:]
+        for _ in range(max_repetitions):
+            for i, oid in enumerate(current):
+                key = self.next(oid)
+                if key is None:
+                    response.append((ObjectName(oid), EndOfMibView()))
+                    continue
+                response.append((ObjectName(key), self.data[key]))
+                current[i] = key
+        return None, 0, 0, response
+
+
+class _Target(object):
+    @staticmethod
+    async def create(*args, **kwargs):
+        return None
+
+
+def agent(monkeypatch, interfaces):
+    """Patch the SNMP client to walk interfaces, a list of (ifIndex, ifDescr, ifName)."""
+    data = {snmp.SYS_UPTIME + ".0": TimeTicks(100000)}
+    for index, descr, name in interfaces:
+        column = dict((c, snmp.COLUMNS[c] + ".%d" % index) for c in snmp.COLUMNS)
+        data[column["ifDescr"]] = OctetString(descr)
+        data[column["ifName"]] = OctetString(name)
+        data[column["ifAlias"]] = OctetString("port %d" % index)
+        data[column["ifMtu"]] = Integer(1500)
+        data[column["ifPhysAddress"]] = OctetString(bytes([0x8C, 0x3B, 0xAD, 0, 0, index % 256]))
+        data[column["ifAdminStatus"]] = Integer(1)
+        data[column["ifOperStatus"]] = Integer(1 if index % 2 else 2)
+        data[column["ifLastChange"]] = TimeTicks(50000)
+        data[column["ifHighSpeed"]] = Integer(1000)
+        for counter in snmp.COUNTER_COLUMNS[2:]:
+            data[column[counter]] = Counter64(index * 1000)
+    fake = FakeAgent(data)
+    monkeypatch.setattr(snmp, "bulk_cmd", fake.bulk_cmd)
+    monkeypatch.setattr(snmp, "ObjectType", lambda identity: (identity,))
+    monkeypatch.setattr(snmp, "ObjectIdentity", lambda oid: oid)
+    monkeypatch.setattr(snmp, "UdpTransportTarget", _Target)
+    return fake
+
+
+def test_walk_all_rows(monkeypatch):
+    ports = [(i, "Unit: 1 Slot: 0 Port: %d Gigabit - Level" % i, "0/%d" % i) for i in range(1, 53)]
+    fake = agent(monkeypatch, ports + [(650, "lag 1", "lag 1")])
+    client = snmp.SnmpClient("192.0.2.1", max_repetitions=10)
+    counters = client.get_interfaces_counters()
+    assert sorted(counters, key=lambda name: int(name.split("/")[1])) == [
+        "0/%d" % i for i in range(1, 53)
+    ]
+    assert counters["0/7"]["rx_octets"] == 7000
+    assert counters["0/7"]["tx_errors"] == 7000
+    # the columns are walked side by side, max_repetitions rows per request
+    assert fake.requests <= 53 // 10 + 2
+
+
+def test_interfaces(monkeypatch):
+    agent(monkeypatch, [(1, "Unit: 1 Slot: 0 Port: 1 Gigabit - Level", "0/1")])
+    interfaces = snmp.SnmpClient("192.0.2.1").get_interfaces()
+    assert interfaces == {
+        "0/1": {
+            "is_enabled": True,
+            "is_up": True,
+            "description": "port 1",
+            "mac_address": "8C:3B:AD:00:00:01",
+            "last_flapped": 500.0,
+            "mtu": 1500,
+            "speed": 1000,
+        }
+    }
+
+
+def test_names_from_descr(monkeypatch):
+    agent(monkeypatch, [
+        (1, "Unit: 1 Slot: 0 Port: 1 Gigabit - Level", ""),
+        (2, "Unit: 1 Slot: 0 Port: 2 Gigabit - Level", ""),
+    ])
+    assert list(snmp.SnmpClient("192.0.2.1").get_interfaces()) == ["0/1", "0/2"]
+
+
+def test_names_from_descr_on_a_stack(monkeypatch):
+    agent(monkeypatch, [
+        (1, "Unit: 1 Slot: 0 Port: 1 Gigabit - Level", ""),
+        (53, "Unit: 2 Slot: 0 Port: 1 Gigabit - Level", ""),
+    ])
+    assert list(snmp.SnmpClient("192.0.2.1").get_interfaces()) == ["1/0/1", "2/0/1"]
+
+
+def test_names_from_descr_like_the_other_names(monkeypatch):
+    agent(monkeypatch, [
+        (1, "Unit: 1 Slot: 0 Port: 1 Gigabit - Level", "1/0/1"),
+        (2, "Unit: 1 Slot: 0 Port: 2 Gigabit - Level", ""),
+    ])
+    assert list(snmp.SnmpClient("192.0.2.1").get_interfaces()) == ["1/0/1", "1/0/2"]